@@ -6,8 +6,10 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 from app.core.config import settings
 from app.core.db import Base
+from app.models import allocation  # noqa: F401
 from app.models import charity_project  # noqa: F401
 from app.models import donation  # noqa: F401
+from app.models import fund_stats  # noqa: F401
 
 config = context.config
 
@@ -0,0 +1,54 @@
+"""Add allocation table
+
+Revision ID: 5c1d7e2b9f30
+Revises: a42ef975392c
+Create Date: 2026-10-17 22:30:00.000000
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5c1d7e2b9f30'
+down_revision = 'a42ef975392c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'allocation',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('donation_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('create_date', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['donation_id'], ['donation.id'],
+            name='fk_allocation_donation_id_donation',
+        ),
+        sa.ForeignKeyConstraint(
+            ['project_id'], ['charityproject.id'],
+            name='fk_allocation_project_id_charityproject',
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    with op.batch_alter_table('allocation', schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f('ix_allocation_donation_id'),
+            ['donation_id'],
+            unique=False,
+        )
+        batch_op.create_index(
+            batch_op.f('ix_allocation_project_id'),
+            ['project_id'],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('allocation', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_allocation_project_id'))
+        batch_op.drop_index(batch_op.f('ix_allocation_donation_id'))
+    op.drop_table('allocation')
@@ -0,0 +1,41 @@
+"""Add fundstats table
+
+Revision ID: 8e4f0b6a2d17
+Revises: 5c1d7e2b9f30
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '8e4f0b6a2d17'
+down_revision = '5c1d7e2b9f30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'fundstats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('total_raised', sa.Integer(), nullable=False),
+        sa.Column('total_invested', sa.Integer(), nullable=False),
+        sa.Column('open_projects', sa.Integer(), nullable=False),
+        sa.Column('closed_projects', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # Единственная строка показателей считается по уже накопленным данным.
+    op.execute(
+        'INSERT INTO fundstats (id, total_raised, total_invested, '
+        'open_projects, closed_projects) SELECT 1, '
+        '(SELECT coalesce(sum(full_amount), 0) FROM donation), '
+        '(SELECT coalesce(sum(invested_amount), 0) FROM donation), '
+        '(SELECT count(*) FROM charityproject WHERE NOT fully_invested), '
+        '(SELECT count(*) FROM charityproject WHERE fully_invested)'
+    )
+
+
+def downgrade():
+    op.drop_table('fundstats')
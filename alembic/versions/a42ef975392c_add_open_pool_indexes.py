@@ -0,0 +1,40 @@
+"""Add partial indexes for open pool queries and donation.user_id index
+
+Revision ID: a42ef975392c
+Revises: ea6c55461497
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a42ef975392c'
+down_revision = 'ea6c55461497'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('charityproject', 'donation'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(
+                f'ix_{table}_open_fifo',
+                ['create_date', 'id'],
+                unique=False,
+                sqlite_where=sa.text('fully_invested = 0'),
+                postgresql_where=sa.text('fully_invested = false'),
+            )
+    with op.batch_alter_table('donation', schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f('ix_donation_user_id'), ['user_id'], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('donation', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_donation_user_id'))
+    for table in ('donation', 'charityproject'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_open_fifo')
@@ -0,0 +1,35 @@
+"""Add version column to CharityProject and Donation
+
+Revision ID: ea6c55461497
+Revises: 3347d451b077
+Create Date: 2026-10-17 21:40:00.000000
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'ea6c55461497'
+down_revision = '3347d451b077'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('charityproject', 'donation'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column(
+                    'version',
+                    sa.Integer(),
+                    server_default='1',
+                    nullable=False,
+                )
+            )
+
+
+def downgrade():
+    for table in ('donation', 'charityproject'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('version')
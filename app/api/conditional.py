@@ -0,0 +1,61 @@
+from collections.abc import Hashable
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from app.services.versions import data_versions
+
+
+def _weak(tag: str) -> str:
+    return tag.strip().removeprefix('W/')
+
+
+def is_not_modified(request: Request, etag: str, modified: datetime) -> bool:
+    """
+    Актуальна ли копия клиента.
+
+    `If-None-Match` сравнивается слабым сравнением; `If-Modified-Since`
+    учитывается, только если `If-None-Match` нет.
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = if_none_match.split(',')
+        return any(
+            tag.strip() == '*' or _weak(tag) == _weak(etag) for tag in tags
+        )
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return since.tzinfo is not None and modified.replace(
+        microsecond=0
+    ) <= since
+
+
+def conditional(
+    request: Request,
+    response: Response,
+    key: Hashable,
+) -> Optional[Response]:
+    """
+    Добавить ETag и Last-Modified версии `key` к ответу.
+
+    Если копия клиента актуальна, возвращается готовый ответ 304,
+    и запрос к базе выполнять не нужно.
+    """
+    _, modified = data_versions.get(key)
+    headers = {
+        'ETag': data_versions.etag(key),
+        'Last-Modified': format_datetime(modified, usegmt=True),
+    }
+    response.headers.update(headers)
+    if is_not_modified(request, headers['ETag'], modified):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+        )
+    return None
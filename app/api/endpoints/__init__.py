@@ -2,3 +2,5 @@ from app.api.endpoints.charity_project import \
     router as charity_project_router  # noqa
 from app.api.endpoints.donation import router as donation_router  # noqa
 from app.api.endpoints.google_api import router as google_api_router  # noqa
+from app.api.endpoints.investment import \
+    router as investment_router  # noqa
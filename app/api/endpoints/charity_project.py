@@ -1,36 +1,86 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from typing import Annotated
 
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+
+from app.api.conditional import conditional
+from app.api.pagination import PAGE_DEP, encode_cursor
 from app.api.validators import (validate_full_amount_not_less_than_invested,
                                 validate_project_can_be_deleted,
                                 validate_project_exists,
                                 validate_project_name_unique,
                                 validate_project_name_unique_on_update,
+                                validate_project_names_unique,
                                 validate_project_not_closed)
 from app.core import current_superuser
-from app.core.constants import SESSION_DEP
+from app.core.constants import (NEXT_CURSOR_HEADER, SESSION_DEP,
+                                SESSION_FACTORY_DEP)
+from app.crud.allocation import allocation_crud
 from app.crud.charity_project import charity_project_crud as crud
-from app.models import Donation
-from app.schemas.charity_project import (CharityProjectCreate,
+from app.crud.donation import donation_crud
+from app.models import CharityProject
+from app.schemas.allocation import AllocationDB
+from app.schemas.charity_project import (CharityProjectBulkResult,
+                                         CharityProjectCreate,
                                          CharityProjectDB,
                                          CharityProjectUpdate)
-from app.services.investment import invest_funds
+from app.services.allocation import allocate, allocate_batch
+from app.services.cache import project_cache
+from app.services.export import (MEDIA_TYPES, NDJSON, ExportFormat,
+                                 stream_export)
+from app.services.fund_stats import count_created
+from app.services.ledger import track_changes
+from app.services.versions import DONATIONS, PROJECTS, data_versions
+from app.services.writer import allocation_writer
 
 router = APIRouter(
     prefix="/charity_project",
     tags=["Проекты для пожертвований"],
 )
 
+PROJECT_FIELDS = list(CharityProjectDB.model_fields)
+PROJECT_LIST = TypeAdapter(list[CharityProjectDB])
+
+
+async def cached_response(key, build, response: Response) -> Response:
+    """
+    Ответ с телом и заголовками из кэша проектов.
+
+    Заголовки `response` (ETag, Last-Modified) добавляются к ответу.
+    """
+    body, headers = await project_cache.get_or_build(key, build)
+    return Response(
+        body,
+        media_type="application/json",
+        headers=headers | dict(response.headers),
+    )
+
 
 @router.get("/", response_model=list[CharityProjectDB])
-async def get_projects(session: SESSION_DEP):
+async def get_projects(
+    session: SESSION_DEP,
+    page: PAGE_DEP,
+    request: Request,
+    response: Response,
+):
     """
     Получить список всех проектов.
 
     Проекты возвращаются в порядке возрастания `id`.
 
+    Параметры `limit` и `cursor` включают постраничную выдачу: курсор
+    следующей страницы возвращается в заголовке `X-Next-Cursor`
+    (заголовка нет на последней странице). Без них список возвращается
+    целиком.
+
+    Готовые ответы кэшируются до ближайшего изменения проектов или
+    пожертвований. Ответ содержит заголовки `ETag` и `Last-Modified`
+    версии данных проектов: на запрос с актуальным `If-None-Match`
+    возвращается `304` без тела.
+
     **Ответ:** список объектов проекта.
 
     Пример ответа:
@@ -49,7 +99,95 @@ async def get_projects(session: SESSION_DEP):
     ]
     ```
     """
-    return await crud.get_multi(session)
+    not_modified = conditional(request, response, PROJECTS)
+    if not_modified is not None:
+        return not_modified
+
+    async def build():
+        if page is None:
+            rows, next_id = (
+                await crud.get_multi_rows(session, PROJECT_FIELDS), None
+            )
+        else:
+            rows, next_id = await crud.get_page(
+                session, page.limit, page.after_id, fields=PROJECT_FIELDS
+            )
+        headers = (
+            {} if next_id is None
+            else {NEXT_CURSOR_HEADER: encode_cursor(next_id)}
+        )
+        return (
+            PROJECT_LIST.dump_json(PROJECT_LIST.validate_python(rows)),
+            headers,
+        )
+
+    if page is None:
+        return await cached_response(("projects",), build, response)
+    return await cached_response(
+        ("projects", page.limit, page.after_id), build, response
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    dependencies=[Depends(current_superuser)],
+)
+async def export_projects(
+    session_factory: SESSION_FACTORY_DEP,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = NDJSON,
+):
+    """
+    Выгрузить все проекты в NDJSON или CSV.
+
+    Доступно только для суперпользователей.
+
+    Строки читаются из базы потоком и отправляются порциями. Поля те же,
+    что у `GET /charity_project/`; в CSV первая строка — заголовок.
+    """
+    return StreamingResponse(
+        stream_export(
+            session_factory,
+            CharityProject,
+            PROJECT_FIELDS,
+            export_format,
+        ),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition":
+                f"attachment; filename=charity_projects.{export_format}"
+        },
+    )
+
+
+@router.get("/{project_id}", response_model=CharityProjectDB)
+async def get_project(
+    project_id: int,
+    session: SESSION_DEP,
+    request: Request,
+    response: Response,
+):
+    """
+    Получить проект по `project_id`.
+
+    Ответ кэшируется и поддерживает `If-None-Match` так же, как список
+    проектов.
+
+    **Ошибки:**
+    - `404` — проект не найден.
+    """
+    not_modified = conditional(request, response, PROJECTS)
+    if not_modified is not None:
+        return not_modified
+
+    async def build():
+        rows = await crud.get_multi_rows(
+            session, PROJECT_FIELDS, CharityProject.id == project_id
+        )
+        validate_project_exists(rows)
+        return CharityProjectDB.model_validate(rows[0]).model_dump_json(), {}
+
+    return await cached_response(("project", project_id), build, response)
 
 
 @router.post(
@@ -83,22 +221,74 @@ async def create_project(
     }
     ```
     """
-    await validate_project_name_unique(crud, session, data.name)
+    async def create(session):
+        await validate_project_name_unique(crud, session, data.name)
+        project = await crud.create(session, data)
+        await allocate(session, project, donation_crud)
+        return project
+
+    project = await allocation_writer.execute(create, session)
+    data_versions.bump(PROJECTS, DONATIONS)
+    return project
 
-    project = await crud.create(session, data)
 
-    result = await session.execute(
-        select(Donation)
-        .where(Donation.fully_invested.is_(False))
-        .order_by(Donation.create_date, Donation.id)
-    )
-    donations = list(result.scalars().all())
+@router.post(
+    "/bulk",
+    response_model=CharityProjectBulkResult,
+    dependencies=[Depends(current_superuser)],
+)
+async def create_projects_bulk(
+    projects_in: Annotated[list[CharityProjectCreate], Body(min_length=1)],
+    session: SESSION_DEP,
+):
+    """
+    Создать пачку благотворительных проектов одним запросом.
 
-    invest_funds(project, donations)
+    Доступно только для суперпользователей.
 
-    await session.commit()
-    await session.refresh(project)
-    return project
+    Всё выполняется в одной транзакции: уникальность имён проверяется
+    одним запросом, проекты вставляются одним многострочным INSERT,
+    а нераспределённые пожертвования вкладываются в проекты пачки
+    в порядке их перечисления за один проход.
+
+    **Ошибки:**
+    - `400` — имена в пачке повторяются или проект с таким именем
+    уже существует.
+
+    Пример запроса:
+    ```json
+    [
+      {
+        "name": "Корм на зиму",
+        "description": "Закупка корма на зимний сезон.",
+        "full_amount": 30000
+      },
+      {
+        "name": "Утепление вольеров",
+        "description": "Материалы для утепления вольеров.",
+        "full_amount": 45000
+      }
+    ]
+    ```
+    """
+    async def create(session):
+        await validate_project_names_unique(
+            crud, session, [project_in.name for project_in in projects_in]
+        )
+        projects = crud.build_multi(projects_in)
+        transfers = []
+        summary = await allocate_batch(
+            session, projects, donation_crud, transfers
+        )
+        await crud.create_multi(session, projects)
+        await allocation_crud.record(session, transfers)
+        track_changes(session, projects)
+        count_created(session, projects)
+        return dict(items=projects, summary=summary)
+
+    result = await allocation_writer.execute(create, session)
+    data_versions.bump(PROJECTS, DONATIONS)
+    return result
 
 
 @router.patch(
@@ -166,6 +356,7 @@ async def update_project(
         project.close_date = datetime.now()
 
     await session.commit()
+    data_versions.bump(PROJECTS)
     await session.refresh(project)
     return project
 
@@ -205,4 +396,41 @@ async def delete_project(
 
     await crud.remove(session, project)
     await session.commit()
+    data_versions.bump(PROJECTS)
     return project
+
+
+@router.get(
+    "/{project_id}/allocations",
+    response_model=list[AllocationDB],
+    dependencies=[Depends(current_superuser)],
+)
+async def get_project_allocations(
+    project_id: int,
+    session: SESSION_DEP,
+):
+    """
+    Получить пожертвования, из которых финансировался проект.
+
+    Доступно только для суперпользователей.
+
+    Переводы читаются из журнала распределения в порядке записи.
+
+    **Ошибки:**
+    - `404` — проект не найден.
+
+    Пример ответа:
+    ```json
+    [
+      {
+        "id": 7,
+        "donation_id": 3,
+        "project_id": 1,
+        "amount": 1500,
+        "create_date": "2026-02-06T12:20:00"
+      }
+    ]
+    ```
+    """
+    validate_project_exists(await crud.get(session, project_id))
+    return await allocation_crud.get_by_project(session, project_id)
@@ -1,29 +1,51 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from app.core.constants import SESSION_DEP
+from app.api.conditional import conditional
+from app.api.pagination import PAGE_DEP, paginate
+from app.api.validators import (validate_donation_exists,
+                                validate_donation_owner)
+from app.core.constants import SESSION_DEP, SESSION_FACTORY_DEP
 from app.core.user import current_superuser, current_user
+from app.crud.allocation import allocation_crud
+from app.crud.charity_project import charity_project_crud
 from app.crud.donation import donation_crud as crud
-from app.models import User
-from app.models.charity_project import CharityProject
-from app.schemas.donation import (DonationCreate, DonationFullInfoDB,
-                                  DonationUserDB)
-from app.services.investment import invest_funds
+from app.models import Donation, User
+from app.schemas.donation import (DonationAllocationStatus,
+                                  DonationBulkResult, DonationCreate,
+                                  DonationFullInfoDB, DonationUserDB)
+from app.services.allocation import allocate, allocate_batch
+from app.services.background import background_allocator
+from app.services.export import (MEDIA_TYPES, NDJSON, ExportFormat,
+                                 stream_export)
+from app.services.fund_stats import count_created
+from app.services.ledger import track_changes
+from app.services.versions import (DONATIONS, PROJECTS, data_versions,
+                                   user_donations)
+from app.services.writer import allocation_writer
 
 router = APIRouter(
     prefix="/donation",
     tags=["Пожертвования"],
 )
 
+DONATION_FIELDS = list(DonationFullInfoDB.model_fields)
+USER_DONATION_FIELDS = list(DonationUserDB.model_fields)
+
 
 @router.get(
     "/",
     response_model=list[DonationFullInfoDB],
     dependencies=[Depends(current_superuser)],
 )
-async def get_donations(session: SESSION_DEP):
+async def get_donations(
+    session: SESSION_DEP,
+    page: PAGE_DEP,
+    request: Request,
+    response: Response,
+):
     """
     Получить список всех пожертвований.
 
@@ -33,6 +55,14 @@ async def get_donations(session: SESSION_DEP):
     В ответе содержится расширенная информация, включая суммы,
     распределённые по проектам.
 
+    Параметры `limit` и `cursor` включают постраничную выдачу: курсор
+    следующей страницы возвращается в заголовке `X-Next-Cursor`.
+    Без них список возвращается целиком.
+
+    Заголовки `ETag` и `Last-Modified` соответствуют версии данных
+    пожертвований; на запрос с актуальным `If-None-Match` возвращается
+    `304` без обращения к базе.
+
     **Ответ:** список объектов пожертвований.
 
     Пример ответа:
@@ -51,7 +81,53 @@ async def get_donations(session: SESSION_DEP):
     ]
     ```
     """
-    return await crud.get_multi(session)
+    not_modified = conditional(request, response, DONATIONS)
+    if not_modified is not None:
+        return not_modified
+    if page is not None:
+        return await paginate(
+            crud, session, page, response, fields=DONATION_FIELDS
+        )
+    return await crud.get_multi_rows(session, DONATION_FIELDS)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    dependencies=[Depends(current_superuser)],
+)
+async def export_donations(
+    session_factory: SESSION_FACTORY_DEP,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = NDJSON,
+):
+    """
+    Выгрузить все пожертвования в NDJSON или CSV.
+
+    Доступно только для суперпользователей.
+
+    Строки читаются из базы потоком и отправляются порциями, поэтому
+    выгрузка начинается сразу и не держит всю таблицу в памяти.
+    Поля те же, что у `GET /donation/`; в CSV первая строка — заголовок.
+
+    Пример ответа (`format=ndjson`):
+    ```
+    {"id": 1, "full_amount": 500, "comment": null, ...}
+    {"id": 2, "full_amount": 1500, "comment": "Помощь", ...}
+    ```
+    """
+    return StreamingResponse(
+        stream_export(
+            session_factory,
+            Donation,
+            DONATION_FIELDS,
+            export_format,
+        ),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition":
+                f"attachment; filename=donations.{export_format}"
+        },
+    )
 
 
 @router.post(
@@ -75,6 +151,10 @@ async def create_donation(
     Если на момент создания пожертвования нет открытых проектов,
     средства остаются нераспределёнными до появления нового проекта.
 
+    При `INVESTMENT_MODE=background` пожертвование только сохраняется,
+    а распределяется в фоне; ход распределения показывает
+    `GET /donation/{donation_id}/allocation`.
+
     Пример запроса:
     ```json
     {
@@ -96,20 +176,100 @@ async def create_donation(
     }
     ```
     """
-    donation = await crud.create(session, donation_in, user)
+    if background_allocator.enabled:
+        donation = await crud.create(session, donation_in, user)
+        await session.commit()
+        data_versions.bump(DONATIONS, user_donations(user.id))
+        background_allocator.enqueue(donation.id)
+        return donation
+
+    async def create(session):
+        donation = await crud.create(session, donation_in, user)
+        await allocate(session, donation, charity_project_crud)
+        return donation
 
-    result = await session.execute(
-        select(CharityProject)
-        .where(CharityProject.fully_invested.is_(False))
-        .order_by(CharityProject.create_date, CharityProject.id)
+    donation = await allocation_writer.execute(
+        create, session, reload=(user,)
     )
-    projects = list(result.scalars().all())
+    data_versions.bump(PROJECTS, DONATIONS, user_donations(user.id))
+    return donation
 
-    invest_funds(donation, projects)
 
-    await session.commit()
-    await session.refresh(donation)
-    return donation
+@router.post(
+    "/bulk",
+    response_model=DonationBulkResult,
+    response_model_exclude_none=True,
+)
+async def create_donations_bulk(
+    donations_in: Annotated[list[DonationCreate], Body(min_length=1)],
+    session: SESSION_DEP,
+    user: Annotated[User, Depends(current_user)]
+):
+    """
+    Создать пачку пожертвований одним запросом.
+
+    Пожертвования распределяются по открытым проектам так же, как при
+    последовательных запросах к `POST /donation/` в порядке элементов
+    пачки, но за один проход и одну транзакцию. Все пожертвования
+    вставляются одним многострочным INSERT.
+
+    В ответе — результат по каждому пожертвованию и сводка распределения.
+
+    Пример запроса:
+    ```json
+    [
+      {"full_amount": 500, "comment": "Платёж 1"},
+      {"full_amount": 1500}
+    ]
+    ```
+
+    Пример ответа:
+    ```json
+    {
+      "items": [
+        {
+          "id": 10,
+          "comment": "Платёж 1",
+          "full_amount": 500,
+          "invested_amount": 500,
+          "fully_invested": true,
+          "create_date": "2026-02-06T12:20:00"
+        },
+        {
+          "id": 11,
+          "full_amount": 1500,
+          "invested_amount": 700,
+          "fully_invested": false,
+          "create_date": "2026-02-06T12:20:00"
+        }
+      ],
+      "summary": {
+        "items": 2,
+        "full_amount": 2000,
+        "invested_amount": 1200,
+        "unallocated_amount": 800,
+        "closed_items": 1,
+        "touched_counterparts": 1,
+        "closed_counterparts": 1
+      }
+    }
+    ```
+    """
+    async def create(session):
+        donations = crud.build_multi(donations_in, user)
+        transfers = []
+        summary = await allocate_batch(
+            session, donations, charity_project_crud, transfers
+        )
+        await crud.create_multi(session, donations)
+        await allocation_crud.record(session, transfers)
+        track_changes(session, donations)
+        count_created(session, donations)
+        return dict(items=donations, summary=summary)
+
+    result = await allocation_writer.execute(create, session, reload=(user,))
+    data_versions.bump(PROJECTS, DONATIONS, user_donations(user.id))
+    return result
 
 
 @router.get(
@@ -117,8 +277,95 @@ async def create_donation(
     response_model=list[DonationUserDB],
 )
 async def get_my_donations(
+    session: SESSION_DEP,
+    user: Annotated[User, Depends(current_user)],
+    page: PAGE_DEP,
+    request: Request,
+    response: Response,
+):
+    """
+    Получает список всех пожертвований текущего пользователя.
+
+    Поддерживает постраничную выдачу и `If-None-Match`, как
+    `GET /donation/`; версия данных своя у каждого пользователя.
+    """
+    not_modified = conditional(request, response, user_donations(user.id))
+    if not_modified is not None:
+        return not_modified
+    if page is not None:
+        return await paginate(
+            crud,
+            session,
+            page,
+            response,
+            Donation.user_id == user.id,
+            fields=USER_DONATION_FIELDS,
+        )
+    return await crud.get_multi_rows(
+        session, USER_DONATION_FIELDS, Donation.user_id == user.id
+    )
+
+
+@router.get(
+    '/{donation_id}/allocation',
+    response_model=DonationAllocationStatus,
+)
+async def get_donation_allocation(
+    donation_id: int,
     session: SESSION_DEP,
     user: Annotated[User, Depends(current_user)]
 ):
-    """Получает список всех пожертвований текущего пользователя."""
-    return await crud.get_by_user(session, user)
\ No newline at end of file
+    """
+    Получить состояние распределения пожертвования и его переводы
+    в проекты.
+
+    Доступно автору пожертвования и суперпользователям.
+
+    - `pending` — пожертвование ждёт фонового распределения;
+    - `allocated` — распределение выполнено;
+    - `failed` — фоновое распределение не удалось, оно будет повторено
+      при следующем запуске приложения.
+
+    `allocations` — переводы средств пожертвования в проекты из журнала
+    распределения.
+
+    Пример ответа:
+    ```json
+    {
+      "id": 3,
+      "status": "allocated",
+      "full_amount": 5000,
+      "invested_amount": 2000,
+      "fully_invested": false,
+      "allocations": [
+        {
+          "id": 7,
+          "donation_id": 3,
+          "project_id": 1,
+          "amount": 1500,
+          "create_date": "2026-02-06T12:20:00"
+        },
+        {
+          "id": 8,
+          "donation_id": 3,
+          "project_id": 2,
+          "amount": 500,
+          "create_date": "2026-02-06T12:20:00"
+        }
+      ]
+    }
+    ```
+    """
+    donation = await crud.get(session, donation_id)
+    validate_donation_exists(donation)
+    validate_donation_owner(donation, user)
+    return DonationAllocationStatus(
+        id=donation.id,
+        status=background_allocator.state(donation_id),
+        full_amount=donation.full_amount,
+        invested_amount=donation.invested_amount,
+        fully_invested=donation.fully_invested,
+        allocations=await allocation_crud.get_by_donation(
+            session, donation_id
+        ),
+    )
@@ -1,20 +1,17 @@
 from http import HTTPStatus
 
 from aiogoogle import Aiogoogle
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.constants import SESSION_FACTORY_DEP
 from app.core.db import get_async_session
 from app.core.google_client import (GoogleAPIError,
                                     GoogleAuthError,
                                     get_service)
 from app.core.user import current_superuser
-from app.crud.charity_project import charity_project_crud
-from app.services.google_api import (format_data_report,
-                                     format_time,
-                                     set_user_permissions,
-                                     spreadsheets_create,
-                                     spreadsheets_update_value)
+from app.schemas.report import ReportJobDB
+from app.services.reports import build_report, report_jobs
 
 router = APIRouter()
 
@@ -36,14 +33,20 @@ async def get_report(
     Эндпоинт создаёт Google Spreadsheet в Google Drive и заполняет его
     отчётом «Топ проектов по скорости закрытия».
 
+    Документы обнаружения Sheets и Drive API загружаются один раз на
+    процесс (и кэшируются на диске), поэтому запрос выполняет только
+    вызовы самих API.
+
     Алгоритм работы:
     1. Получаются завершённые проекты, отсортированные по скорости закрытия.
     2. Рассчитывается длительность сбора средств для каждого проекта.
     3. Формируется структура таблицы.
-    4. Создаётся Google Spreadsheet через Google Drive API.
-    5. Выдаются права доступа сервисному аккаунту.
-    6. Таблица заполняется данными через Google Sheets API.
-    7. Возвращается ссылка на созданный документ.
+    4. Создаётся Google Spreadsheet с сеткой по числу закрытых проектов
+    и первой порцией данных отчёта (`ROWS_LIMIT` строк).
+    5. Выдаются права доступа через Google Drive API; одновременно
+    остальные строки дописываются порциями, не больше
+    `REPORT_MAX_WRITES` запросов сразу.
+    6. Возвращается ссылка на созданный документ.
 
     Структура таблицы:
     - Дата формирования отчёта
@@ -60,33 +63,12 @@ async def get_report(
     "https://docs.google.com/spreadsheets/d/1AbCDefGhIjKlMnOpQrStUvWxYz/edit"
     """
     try:
-        table_body = await format_data_report(
-            dict(
-                name=project.name,
-                time=format_time(project.time),
-                description=project.description,
-            ) for project in
-            await charity_project_crud.get_projects_by_completion_rate(session)
-        )
-
-        spreadsheet_id, spreadsheet_url = await spreadsheets_create(
-            wrapper_services
-        )
-
-        await set_user_permissions(spreadsheet_id, wrapper_services)
-        try:
-            await spreadsheets_update_value(
-                wrapper_services,
-                spreadsheet_id,
-                table_body,
-            )
-        except ValueError as e:
-            raise HTTPException(
-                status_code=HTTPStatus.BAD_REQUEST,
-                detail="Некорректные данные для заполнения таблицы.",
-            ) from e
-
-        return spreadsheet_url
+        return await build_report(session, wrapper_services)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Некорректные данные для заполнения таблицы.",
+        ) from e
     except GoogleAuthError as e:
         raise HTTPException(
             status_code=HTTPStatus.SERVICE_UNAVAILABLE,
@@ -104,3 +86,50 @@ async def get_report(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
             detail='Внутренняя ошибка сервера.',
         ) from e
+
+
+@router.post(
+    '/jobs',
+    response_model=ReportJobDB,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(current_superuser)],
+)
+async def create_report_job(session_factory: SESSION_FACTORY_DEP):
+    """
+    Запустить формирование Google-отчёта в фоне.
+
+    Доступно только суперпользователям.
+
+    Ответ возвращается сразу и содержит `id` задания; ход выполнения
+    показывает `GET /google/jobs/{job_id}`. Пока задание не завершено,
+    повторные запросы получают то же задание.
+    """
+    return report_jobs.submit(session_factory)
+
+
+@router.get(
+    '/jobs/{job_id}',
+    response_model=ReportJobDB,
+    dependencies=[Depends(current_superuser)],
+)
+async def get_report_job(job_id: str):
+    """
+    Получить состояние задания отчёта.
+
+    Доступно только суперпользователям.
+
+    `timings` — длительности этапов в секундах (`query`, `discovery`,
+    `create`, `permissions`, `write` — дозапись строк вместе с выдачей
+    прав, `total`), `url` — ссылка на готовую таблицу, `error` — причина
+    ошибки.
+
+    **Ошибки:**
+    - `404` — задание не найдено.
+    """
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail='Задание не найдено.',
+        )
+    return job
@@ -0,0 +1,87 @@
+from fastapi import APIRouter, Depends
+
+from app.core import current_superuser
+from app.core.constants import SESSION_DEP
+from app.schemas.investment import (FundStatsDB, LedgerCheck,
+                                    ResponseCacheStats)
+from app.services.cache import project_cache
+from app.services.fund_stats import get_stats, reconcile
+from app.services.ledger import open_pool_ledger
+
+router = APIRouter(
+    prefix="/investment",
+    tags=["Инвестирование"],
+    dependencies=[Depends(current_superuser)],
+)
+
+
+@router.get("/ledger", response_model=LedgerCheck)
+async def check_ledger(session: SESSION_DEP):
+    """
+    Сверить резидентный учёт открытых проектов и пожертвований с базой.
+
+    Доступно только для суперпользователей.
+
+    Для каждой очереди возвращаются количество открытых объектов и сумма
+    их нераспределённых остатков — по учёту и по базе, а также `id`
+    объектов, остатки которых расходятся.
+    """
+    return await open_pool_ledger.check(session)
+
+
+@router.post("/ledger/rebuild", response_model=LedgerCheck)
+async def rebuild_ledger(session: SESSION_DEP):
+    """
+    Перестроить резидентный учёт открытых объектов по данным базы.
+
+    Доступно только для суперпользователей. Используется, если сверка
+    показала расхождения.
+    """
+    await open_pool_ledger.build(session)
+    return await open_pool_ledger.check(session)
+
+
+@router.get("/stats", response_model=FundStatsDB)
+async def get_fund_stats(session: SESSION_DEP):
+    """
+    Получить сводные показатели фонда.
+
+    Доступно только для суперпользователей.
+
+    Показатели читаются из одной строки, которая обновляется в той же
+    транзакции, что и пожертвования и проекты.
+
+    Пример ответа:
+    ```json
+    {
+      "total_raised": 150000,
+      "total_invested": 120000,
+      "total_unallocated": 30000,
+      "open_projects": 3,
+      "closed_projects": 12
+    }
+    ```
+    """
+    return await get_stats(session)
+
+
+@router.post("/stats/reconcile", response_model=FundStatsDB)
+async def reconcile_fund_stats(session: SESSION_DEP):
+    """
+    Пересчитать сводные показатели фонда по всем строкам.
+
+    Доступно только для суперпользователей. То же делает команда
+    `python -m app.services.fund_stats`.
+    """
+    return await reconcile(session)
+
+
+@router.get("/cache", response_model=ResponseCacheStats)
+async def get_cache_stats():
+    """
+    Получить счётчики кэша ответов `GET /charity_project/`.
+
+    Доступно только для суперпользователей. `coalesced` — запросы,
+    дождавшиеся построения записи другим запросом.
+    """
+    return project_cache.stats()
@@ -0,0 +1,71 @@
+import base64
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Annotated, Optional
+
+from fastapi import Depends, HTTPException, Query, Response, status
+
+from app.core.constants import (DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE,
+                                NEXT_CURSOR_HEADER)
+
+
+@dataclass
+class Page:
+    limit: int
+    after_id: Optional[int] = None
+
+
+def encode_cursor(obj_id: int) -> str:
+    return base64.urlsafe_b64encode(f'id:{obj_id}'.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        prefix, obj_id = base64.urlsafe_b64decode(
+            cursor.encode()
+        ).decode().split(':')
+        if prefix != 'id':
+            raise ValueError(prefix)
+        return int(obj_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор страницы.",
+        )
+
+
+async def get_page(
+    limit: Annotated[Optional[int], Query(ge=1, le=MAX_PAGE_SIZE)] = None,
+    cursor: Optional[str] = None,
+) -> Optional[Page]:
+    """
+    Параметры страницы списка.
+
+    Без `limit` и `cursor` список возвращается целиком, как раньше.
+    """
+    if limit is None and cursor is None:
+        return None
+    return Page(
+        limit=limit or DEFAULT_PAGE_SIZE,
+        after_id=decode_cursor(cursor) if cursor is not None else None,
+    )
+
+
+PAGE_DEP = Annotated[Optional[Page], Depends(get_page)]
+
+
+async def paginate(
+    crud,
+    session,
+    page: Page,
+    response: Response,
+    *criteria,
+    fields: Optional[Sequence[str]] = None,
+):
+    """Страница объектов `crud`; курсор следующей — в заголовке ответа."""
+    objs, next_id = await crud.get_page(
+        session, page.limit, page.after_id, *criteria, fields=fields
+    )
+    if next_id is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_id)
+    return objs
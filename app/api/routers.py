@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 
 from app.api.endpoints import (charity_project_router, donation_router,
-                               google_api_router)
+                               google_api_router, investment_router)
 from app.core.user import auth_backend, fastapi_users
 from app.schemas import UserCreate, UserRead, UserUpdate
 
@@ -9,6 +9,7 @@ main_router = APIRouter()
 
 main_router.include_router(charity_project_router)
 main_router.include_router(donation_router)
+main_router.include_router(investment_router)
 
 main_router.include_router(
     google_api_router, prefix='/google', tags=['Google']
@@ -21,6 +21,22 @@ def validate_project_not_closed(project) -> None:
         )
 
 
+def validate_donation_exists(donation) -> None:
+    if not donation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Пожертвование не найдено.",
+        )
+
+
+def validate_donation_owner(donation, user) -> None:
+    if donation.user_id != user.id and not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Нельзя просматривать чужое пожертвование.",
+        )
+
+
 def raise_project_name_not_unique() -> None:
     raise HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST,
@@ -37,6 +53,18 @@ async def validate_project_name_unique(
         raise_project_name_not_unique()
 
 
+async def validate_project_names_unique(
+    crud,
+    session,
+    names: list[str],
+) -> None:
+    if (
+        len(set(names)) != len(names) or
+        await crud.get_existing_names(session, names)
+    ):
+        raise_project_name_not_unique()
+
+
 async def validate_project_name_unique_on_update(
     crud,
     session,
@@ -6,6 +6,18 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     database_url: str = "sqlite+aiosqlite:///./qrkot.db"
     secret: str = 'SECRET'
+    investment_engine: str = 'python'
+    investment_chunk_size: int = 100
+    investment_mode: str = 'sync'
+    allocation_max_retries: int = 3
+    group_commit: bool = False
+    group_commit_window: float = 0.005
+    group_commit_max_batch: int = 100
+    response_cache_size: int = 1000
+    response_cache_ttl: float = 60.0
+    google_discovery_dir: str = '.discovery_cache'
+    google_discovery_max_age: float = 7 * 24 * 3600
+    report_max_writes: int = 4
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
     type: Optional[str] = None
     project_id: Optional[str] = None
@@ -1,14 +1,21 @@
 from typing import Annotated
 
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.db import get_async_session
+from app.core.db import get_async_session, get_session_factory
 
 SESSION_DEP = Annotated[AsyncSession, Depends(get_async_session)]
+SESSION_FACTORY_DEP = Annotated[
+    async_sessionmaker, Depends(get_session_factory)
+]
 NAME_LENGTH = 100
 TOKEN_LIFTIME_SECONDS = 3600
 MIN_PASSWORD_LENGTH = 3
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+EXPORT_CHUNK_SIZE = 1000
 
 GOOGLE_API_URL = 'https://www.googleapis.com/auth/'
 SPREADSHEET_URL = GOOGLE_API_URL + 'spreadsheets'
@@ -25,3 +25,13 @@ AsyncSessionLocal = async_sessionmaker(
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def get_session_factory() -> async_sessionmaker:
+    """
+    Фабрика сессий для ответов, читающих базу после выхода из обработчика.
+
+    Сессия из `get_async_session` закрывается до отправки тела ответа,
+    поэтому потоковая выдача открывает свою сессию.
+    """
+    return AsyncSessionLocal
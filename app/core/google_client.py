@@ -1,5 +1,9 @@
+import asyncio
+from typing import Optional
+
 from aiogoogle import Aiogoogle
 from aiogoogle.auth.creds import ServiceAccountCreds
+from aiogoogle.sessions.aiohttp_session import AiohttpSession
 
 from app.core.config import settings
 from app.core.constants import DRIVE_URL, SPREADSHEET_URL
@@ -25,9 +29,71 @@ INFO = dict(
 CREDENTIALS = ServiceAccountCreds(scopes=SCOPES, **INFO)
 
 
+class GoogleClient:
+    """
+    Клиент Google API на время жизни приложения.
+
+    Один `Aiogoogle` с одной HTTP-сессией (и её пулом соединений)
+    обслуживает все запросы, а токен сервисного аккаунта запрашивается
+    заново, только когда истекает (Aiogoogle обновляет его за две
+    минуты до срока).
+    """
+
+    def __init__(self, creds: ServiceAccountCreds):
+        self.creds = creds
+        self.aiogoogle: Optional[Aiogoogle] = None
+        self.session: Optional[AiohttpSession] = None
+        self.token_lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.session is not None
+
+    async def start(self) -> None:
+        self.aiogoogle = Aiogoogle(service_account_creds=self.creds)
+        self.session = self.aiogoogle.session_factory()
+        await self.session.__aenter__()
+
+    async def stop(self) -> None:
+        if self.session is None:
+            return
+        await self.session.close()
+        self.session = None
+        self.aiogoogle = None
+
+    async def refresh_token(self) -> None:
+        """Обновить токен, если нужно, одним обменом на все запросы."""
+        async with self.token_lock:
+            await self.aiogoogle.service_account_manager.refresh()
+
+
+google_client = GoogleClient(CREDENTIALS)
+
+
 async def get_service():
-    async with Aiogoogle(service_account_creds=CREDENTIALS) as aiogoogle:
+    """
+    Клиент Google API для запроса.
+
+    Если общий клиент запущен (в lifespan приложения), запросы идут
+    через его сессию; иначе клиент создаётся на время запроса.
+    """
+    if not google_client.running:
+        async with Aiogoogle(service_account_creds=CREDENTIALS) as aiogoogle:
+            yield aiogoogle
+        return
+    aiogoogle = google_client.aiogoogle
+    try:
+        await google_client.refresh_token()
+    except Exception:
+        # Ошибку аутентификации вернёт первый вызов API в эндпоинте.
+        pass
+    # Aiogoogle берёт сессию из контекстной переменной: без неё каждый
+    # запрос открыл бы новую сессию.
+    aiogoogle.session_context.set(google_client.session)
+    try:
         yield aiogoogle
+    finally:
+        aiogoogle.session_context.set(None)
 
 
 class GoogleAPIError(Exception):
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from sqlalchemy import Select, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models import Allocation, Donation
+
+
+class CRUDAllocation(CRUDBase):
+
+    async def record(self, session: AsyncSession, transfers) -> None:
+        """
+        Записать переводы (`target`, `source`, сумма) одним INSERT.
+
+        Какая из сторон перевода — пожертвование, а какая — проект,
+        определяется по типу объекта.
+        """
+        if not transfers:
+            return
+        now = datetime.now()
+        rows = []
+        for target, source, amount in transfers:
+            donation, project = (
+                (target, source) if isinstance(target, Donation)
+                else (source, target)
+            )
+            rows.append(dict(
+                donation_id=donation.id,
+                project_id=project.id,
+                amount=amount,
+                create_date=now,
+            ))
+        await session.execute(insert(Allocation), rows)
+
+    async def record_from_select(
+            self,
+            session: AsyncSession,
+            target,
+            sources: Select,
+    ) -> None:
+        """
+        Записать переводы `target` одним INSERT ... SELECT.
+
+        `sources` выбирает пары (`id` источника, сумма).
+        """
+        source_id, amount = sources.selected_columns
+        target_id = literal(target.id)
+        if isinstance(target, Donation):
+            columns = (target_id, source_id)
+        else:
+            columns = (source_id, target_id)
+        await session.execute(
+            insert(Allocation).from_select(
+                ['donation_id', 'project_id', 'amount', 'create_date'],
+                sources.with_only_columns(
+                    *columns, amount, literal(datetime.now())
+                ),
+            )
+        )
+
+    async def get_by_donation(self, session: AsyncSession, donation_id: int):
+        result = await session.execute(
+            select(Allocation)
+            .where(Allocation.donation_id == donation_id)
+            .order_by(Allocation.id)
+        )
+        return list(result.scalars().all())
+
+    async def get_by_project(self, session: AsyncSession, project_id: int):
+        result = await session.execute(
+            select(Allocation)
+            .where(Allocation.project_id == project_id)
+            .order_by(Allocation.id)
+        )
+        return list(result.scalars().all())
+
+
+allocation_crud = CRUDAllocation(Allocation)
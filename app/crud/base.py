@@ -1,7 +1,9 @@
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
 from typing import Optional
 
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select
+from sqlalchemy import RowMapping, and_, insert, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User
@@ -23,6 +25,130 @@ class CRUDBase:
         )
         return list(result.scalars().all())
 
+    def select_fields(self, fields: Sequence[str]):
+        return select(*(getattr(self.model, field) for field in fields))
+
+    async def get_multi_rows(
+            self,
+            session: AsyncSession,
+            fields: Sequence[str],
+            *criteria,
+    ) -> list[RowMapping]:
+        """
+        Столбцы `fields` объектов по возрастанию `id`.
+
+        Строки возвращаются словарями без создания сущностей ORM, поэтому
+        не попадают в identity map и не отслеживаются сессией.
+        """
+        result = await session.execute(
+            self.select_fields(fields)
+            .where(*criteria)
+            .order_by(self.model.id)
+        )
+        return list(result.mappings().all())
+
+    async def get_page(
+            self,
+            session: AsyncSession,
+            limit: int,
+            after_id: Optional[int] = None,
+            *criteria,
+            fields: Optional[Sequence[str]] = None,
+    ) -> tuple[list, Optional[int]]:
+        """
+        Страница из `limit` объектов с `id` больше `after_id`.
+
+        Вторым значением возвращается `id`, после которого начинается
+        следующая страница, или `None`, если страница последняя. С
+        `fields` вместо объектов возвращаются строки этих столбцов, как
+        у `get_multi_rows`.
+        """
+        query = (
+            select(self.model) if fields is None
+            else self.select_fields(fields)
+        )
+        query = (
+            query
+            .where(*criteria)
+            .order_by(self.model.id)
+            .limit(limit + 1)
+        )
+        if after_id is not None:
+            query = query.where(self.model.id > after_id)
+        result = await session.execute(query)
+        objs = list(
+            result.scalars().all() if fields is None
+            else result.mappings().all()
+        )
+        if len(objs) > limit:
+            last = objs[limit - 1]
+            return objs[:limit], (
+                last.id if fields is None else last['id']
+            )
+        return objs, None
+
+    async def iter_opened(
+            self,
+            session: AsyncSession,
+            chunk_size: int,
+    ) -> AsyncIterator[list]:
+        """
+        Открытые объекты в порядке FIFO порциями по `chunk_size`.
+
+        Следующая порция запрашивается по ключу (`create_date`, `id`)
+        последнего объекта, поэтому прекращение итерации сразу
+        прекращает и чтение из базы.
+        """
+        model = self.model
+        query = (
+            select(model)
+            .where(model.is_open())
+            .order_by(model.create_date, model.id)
+            .limit(chunk_size)
+        )
+        last = None
+        while True:
+            page = query
+            if last is not None:
+                page = query.where(or_(
+                    model.create_date > last.create_date,
+                    and_(
+                        model.create_date == last.create_date,
+                        model.id > last.id,
+                    ),
+                ))
+            chunk = list((await session.execute(page)).scalars().all())
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            last = chunk[-1]
+
+    async def get_many(self, session: AsyncSession, ids):
+        result = await session.execute(
+            select(self.model)
+            .where(self.model.id.in_(ids))
+            .order_by(self.model.create_date, self.model.id)
+        )
+        return list(result.scalars().all())
+
+    async def get_open_balances(self, session: AsyncSession):
+        """Строки (`id`, `create_date`, `remaining`) открытых объектов."""
+        model = self.model
+        result = await session.execute(
+            select(
+                model.id,
+                model.create_date,
+                (model.full_amount - model.invested_amount).label(
+                    'remaining'
+                ),
+            )
+            .where(model.is_open())
+            .order_by(model.create_date, model.id)
+        )
+        return result.all()
+
     async def create(
             self,
             session: AsyncSession,
@@ -37,6 +163,53 @@ class CRUDBase:
         await session.flush()
         return db_obj
 
+    def build_multi(self, objs_in, user: Optional[User] = None) -> list:
+        """
+        Новые объекты пачки, ещё не добавленные в сессию.
+
+        Поля со значениями по умолчанию заполняются сразу, чтобы объекты
+        можно было распределить до вставки.
+        """
+        now = datetime.now()
+        db_objs = []
+        for obj_in in objs_in:
+            obj_in_data = obj_in.model_dump()
+            if user is not None:
+                obj_in_data['user_id'] = user.id
+            db_objs.append(self.model(
+                **obj_in_data,
+                invested_amount=0,
+                fully_invested=False,
+                create_date=now,
+            ))
+        return db_objs
+
+    async def create_multi(self, session: AsyncSession, db_objs: list):
+        """Вставить объекты пачки одним многострочным INSERT."""
+        # Колонки, не заполненные ни у одного объекта, получают значения
+        # по умолчанию.
+        columns = [
+            column.key for column in self.model.__table__.columns
+            if not column.primary_key and any(
+                getattr(obj, column.key) is not None for obj in db_objs
+            )
+        ]
+        # Строки RETURNING возвращаются в порядке параметров: SQLAlchemy
+        # сопоставляет их со строками VALUES, а если бэкенд этого не
+        # позволяет, вставляет строки по одной.
+        result = await session.execute(
+            insert(self.model).returning(
+                self.model.id, sort_by_parameter_order=True
+            ),
+            [
+                {column: getattr(obj, column) for column in columns}
+                for obj in db_objs
+            ],
+        )
+        for obj, obj_id in zip(db_objs, result.scalars().all()):
+            obj.id = obj_id
+        return db_objs
+
     async def update(self, session: AsyncSession, db_obj, obj_in):
         obj_data = jsonable_encoder(db_obj)
         update_data = (
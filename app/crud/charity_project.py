@@ -1,3 +1,5 @@
+from collections.abc import AsyncIterator
+
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,24 +14,59 @@ class CRUDCharityProject(CRUDBase):
         )
         return result.scalars().first()
 
-    async def get_projects_by_completion_rate(
-            self, session: AsyncSession
-    ):
+    async def get_existing_names(self, session: AsyncSession, names):
+        result = await session.execute(
+            select(CharityProject.name).where(CharityProject.name.in_(names))
+        )
+        return set(result.scalars().all())
+
+    @staticmethod
+    def completion_rate_query():
         time_delta = (
             func.julianday(CharityProject.close_date) -
             func.julianday(CharityProject.create_date)
         )
+        return select(
+            CharityProject.name,
+            time_delta.label('time'),
+            CharityProject.description,
+        ).where(
+            CharityProject.fully_invested == 1
+        ).order_by(time_delta.label('time'))
+
+    async def get_projects_by_completion_rate(
+            self, session: AsyncSession
+    ):
         return (
-            await session.execute(
-                select(
-                    CharityProject.name,
-                    time_delta.label('time'),
-                    CharityProject.description,
-                ).where(
-                    CharityProject.fully_invested == 1
-                ).order_by(time_delta.label('time'))
-            )
+            await session.execute(self.completion_rate_query())
         ).all()
 
+    async def count_closed(self, session: AsyncSession) -> int:
+        return await session.scalar(
+            select(func.count()).select_from(CharityProject).where(
+                CharityProject.fully_invested == 1
+            )
+        )
+
+    async def iter_projects_by_completion_rate(
+            self,
+            session: AsyncSession,
+            limit: int,
+            chunk_size: int,
+    ) -> AsyncIterator[list]:
+        """
+        Первые `limit` строк `get_projects_by_completion_rate` порциями.
+
+        Строки читаются из базы потоком, в памяти одновременно находится
+        не больше одной порции.
+        """
+        result = await session.stream(
+            self.completion_rate_query()
+            .limit(limit)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for rows in result.partitions():
+            yield rows
+
 
 charity_project_crud = CRUDCharityProject(CharityProject)
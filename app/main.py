@@ -1,11 +1,56 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.api.routers import main_router
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.core.google_client import google_client
+from app.services.background import background_allocator
+from app.services.ledger import open_pool_ledger
+from app.services.reports import report_jobs
+from app.services.writer import allocation_writer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.investment_engine == 'ledger':
+        async with AsyncSessionLocal() as session:
+            await open_pool_ledger.build(session)
+    if settings.group_commit or settings.investment_mode == 'background':
+        await allocation_writer.start(
+            AsyncSessionLocal,
+            window=settings.group_commit_window,
+            max_batch=settings.group_commit_max_batch,
+        )
+    if background_allocator.enabled:
+        async with AsyncSessionLocal() as session:
+            await background_allocator.recover(session)
+    await google_client.start()
+    yield
+    await report_jobs.stop()
+    await google_client.stop()
+    await allocation_writer.stop()
+
 
 app = FastAPI(
     title="Благотворительный фонд поддержки котиков QRKot",
     description="Сервис для поддержки котиков",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.include_router(main_router)
+
+
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={
+            'detail': 'Данные изменились во время распределения средств. '
+                      'Повторите запрос.'
+        },
+    )
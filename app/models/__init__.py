@@ -1,3 +1,5 @@
+from app.models.allocation import Allocation  # noqa
 from app.models.charity_project import CharityProject  # noqa
 from app.models.donation import Donation  # noqa
+from app.models.fund_stats import FundStats  # noqa
 from app.models.user import User  # noqa
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class Allocation(Base):
+    __tablename__ = "allocation"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    donation_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('donation.id', name='fk_allocation_donation_id_donation'),
+        nullable=False,
+        index=True
+    )
+    project_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey(
+            'charityproject.id',
+            name='fk_allocation_project_id_charityproject'
+        ),
+        nullable=False,
+        index=True
+    )
+    amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    create_date: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.now, nullable=False
+    )
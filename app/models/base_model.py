@@ -1,7 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Integer
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Boolean, DateTime, Index, Integer, false, text
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
 
 from app.core.db import Base
 
@@ -22,6 +22,32 @@ class InvestedBase(Base):
     close_date: Mapped[datetime | None] = mapped_column(
         DateTime, nullable=True
     )
+    version: Mapped[int] = mapped_column(
+        Integer, default=1, server_default='1', nullable=False
+    )
+
+    @declared_attr.directive
+    def __table_args__(cls):
+        # Частичный индекс очереди открытых объектов в порядке FIFO.
+        return (
+            Index(
+                f'ix_{cls.__tablename__}_open_fifo',
+                'create_date',
+                'id',
+                sqlite_where=text('fully_invested = 0'),
+                postgresql_where=text('fully_invested = false'),
+            ),
+        )
+
+    @declared_attr.directive
+    def __mapper_args__(cls):
+        # Оптимистическая блокировка: UPDATE проверяет прочитанную версию.
+        return {'version_id_col': cls.__table__.c.version}
+
+    @classmethod
+    def is_open(cls):
+        """Условие отбора открытых объектов, совпадающее с индексом."""
+        return cls.fully_invested == false()
 
     @property
     def remaining(self) -> int:
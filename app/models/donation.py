@@ -19,5 +19,6 @@ class Donation(InvestedBase):
     user_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey('user.id', name='fk_donation_user_id_user'),
-        nullable=True
+        nullable=True,
+        index=True
     )
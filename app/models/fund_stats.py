@@ -0,0 +1,28 @@
+from sqlalchemy import Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+FUND_STATS_ID = 1
+
+
+class FundStats(Base):
+    """Единственная строка со сводными показателями фонда."""
+
+    __tablename__ = "fundstats"
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, default=FUND_STATS_ID
+    )
+    total_raised: Mapped[int] = mapped_column(
+        Integer, default=0, nullable=False
+    )
+    total_invested: Mapped[int] = mapped_column(
+        Integer, default=0, nullable=False
+    )
+    open_projects: Mapped[int] = mapped_column(
+        Integer, default=0, nullable=False
+    )
+    closed_projects: Mapped[int] = mapped_column(
+        Integer, default=0, nullable=False
+    )
@@ -0,0 +1,407 @@
+"""
+Офлайн-прогон журнала событий через алгоритм инвестирования.
+
+Журнал — NDJSON, по одному событию в строке:
+`{"type": "project", "amount": 1000, "timestamp": "2026-02-06T12:00:00"}`.
+Его можно выгрузить из базы (`--from-db`) или сгенерировать
+(`--generate`). Каждый механизм прогоняет журнал с нуля, а отчёт
+содержит итоговое состояние, пропускную способность, пиковую память
+и перцентили задержки на событие.
+
+    python -m app.replay events.ndjson --engine memory --engine sql
+    python -m app.replay --from-db sqlite+aiosqlite:///./qrkot.db \\
+        --export events.ndjson
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Iterable, NamedTuple, Optional, TextIO
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.db import Base
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.models import CharityProject, Donation
+from app.services.allocation import ENGINES, allocate
+from app.services.investment import invest_funds
+from app.services.ledger import open_pool_ledger
+from app.services.records import OpenRecord
+
+PROJECT = 'project'
+DONATION = 'donation'
+MEMORY_ENGINE = 'memory'
+PERCENTILES = (50, 90, 99)
+
+
+class Event(NamedTuple):
+    kind: str
+    amount: int
+    timestamp: datetime
+
+
+def read_events(lines: Iterable[str]) -> list[Event]:
+    events = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        if data['type'] not in (PROJECT, DONATION):
+            raise ValueError(
+                f'Строка {number}: неизвестный тип события {data["type"]}'
+            )
+        events.append(Event(
+            data['type'],
+            int(data['amount']),
+            datetime.fromisoformat(data['timestamp']),
+        ))
+    return events
+
+
+def write_events(events: Iterable[Event], stream: TextIO) -> None:
+    for event in events:
+        stream.write(json.dumps(dict(
+            type=event.kind,
+            amount=event.amount,
+            timestamp=event.timestamp.isoformat(),
+        )) + '\n')
+
+
+def generate_events(
+    count: int,
+    seed: int = 0,
+    project_share: float = 0.1,
+) -> list[Event]:
+    """Случайный журнал: крупные проекты среди мелких пожертвований."""
+    rnd = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    events = []
+    for number in range(count):
+        timestamp = start + timedelta(seconds=number)
+        if rnd.random() < project_share:
+            events.append(
+                Event(PROJECT, rnd.randint(1000, 100000), timestamp)
+            )
+        else:
+            events.append(Event(DONATION, rnd.randint(1, 5000), timestamp))
+    return events
+
+
+async def export_events(session: AsyncSession) -> list[Event]:
+    """
+    Журнал создания проектов и пожертвований из базы.
+
+    События упорядочены по `create_date`; при совпадении дат проекты
+    идут раньше пожертвований.
+    """
+    events = []
+    for kind, model in ((PROJECT, CharityProject), (DONATION, Donation)):
+        result = await session.execute(
+            select(model.full_amount, model.create_date).order_by(model.id)
+        )
+        events.extend(
+            (create_date, kind != PROJECT, Event(kind, amount, create_date))
+            for amount, create_date in result.all()
+        )
+    return [event for *_, event in sorted(events, key=lambda e: e[:2])]
+
+
+def replay_memory(events: list[Event]) -> tuple[dict, list[float]]:
+    """Прогон через `invest_funds` на записях в памяти, без базы."""
+    created = {PROJECT: [], DONATION: []}
+    opened = {PROJECT: deque(), DONATION: deque()}
+    latencies = []
+    for event in events:
+        started = time.perf_counter()
+        source_kind = DONATION if event.kind == PROJECT else PROJECT
+        target = OpenRecord(len(created[event.kind]) + 1, 1, event.amount, 0)
+        created[event.kind].append(target)
+        sources = opened[source_kind]
+        invest_funds(target, sources)
+        while sources and sources[0].fully_invested:
+            sources.popleft()
+        if not target.fully_invested:
+            opened[event.kind].append(target)
+        latencies.append(time.perf_counter() - started)
+    return {
+        kind: [(obj.invested_amount, obj.fully_invested) for obj in objs]
+        for kind, objs in created.items()
+    }, latencies
+
+
+async def create_target(session: AsyncSession, number: int, event: Event):
+    if event.kind == PROJECT:
+        target = CharityProject(
+            name=f'Проект {number}',
+            description='Проект из журнала событий',
+            full_amount=event.amount,
+            create_date=event.timestamp,
+        )
+    else:
+        target = Donation(
+            full_amount=event.amount, create_date=event.timestamp
+        )
+    session.add(target)
+    await session.flush()
+    return target
+
+
+async def prepare_database(db_engine, session_factory) -> None:
+    async with db_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        for model in (CharityProject, Donation):
+            if await session.scalar(select(model.id).limit(1)):
+                raise ValueError(
+                    f'База {db_engine.url} не пуста: прогон выполняется '
+                    f'только на пустой базе.'
+                )
+        if settings.investment_engine == 'ledger':
+            await open_pool_ledger.build(session)
+
+
+async def read_state(session: AsyncSession) -> dict:
+    return {
+        kind: [
+            (obj.invested_amount, obj.fully_invested)
+            for obj in await crud.get_multi(session)
+        ]
+        for kind, crud in (
+            (PROJECT, charity_project_crud),
+            (DONATION, donation_crud),
+        )
+    }
+
+
+async def replay_database(
+    events: list[Event],
+    engine: str,
+    database_url: str = 'sqlite+aiosqlite://',
+) -> tuple[dict, list[float]]:
+    """
+    Прогон через механизм `engine` на пустой базе `database_url`.
+
+    Каждое событие обрабатывается в своей сессии и транзакции, как
+    запрос к API. Таблицы создаются перед прогоном и удаляются после
+    него; непустая база не используется.
+    """
+    db_engine = create_async_engine(database_url, poolclass=StaticPool)
+    session_factory = async_sessionmaker(db_engine, expire_on_commit=False)
+    saved_engine = settings.investment_engine
+    settings.investment_engine = engine
+    prepared = False
+    latencies = []
+    try:
+        await prepare_database(db_engine, session_factory)
+        prepared = True
+        for number, event in enumerate(events, 1):
+            started = time.perf_counter()
+            async with session_factory() as session:
+                target = await create_target(session, number, event)
+                await allocate(
+                    session,
+                    target,
+                    donation_crud if event.kind == PROJECT
+                    else charity_project_crud,
+                )
+                await session.commit()
+            latencies.append(time.perf_counter() - started)
+        async with session_factory() as session:
+            state = await read_state(session)
+    finally:
+        settings.investment_engine = saved_engine
+        if engine == 'ledger':
+            open_pool_ledger.ready = False
+        if prepared:
+            async with db_engine.begin() as connection:
+                await connection.run_sync(Base.metadata.drop_all)
+        await db_engine.dispose()
+    return state, latencies
+
+
+def percentile(values: list[float], rank: int) -> float:
+    """Перцентиль по ближайшему рангу для отсортированных `values`."""
+    if not values:
+        return 0.0
+    index = max(0, -(-rank * len(values) // 100) - 1)
+    return values[index]
+
+
+def summarize(state: dict) -> dict:
+    summary = {}
+    for kind, objs in state.items():
+        summary[kind] = dict(
+            count=len(objs),
+            invested_amount=sum(invested for invested, _ in objs),
+            closed=sum(closed for _, closed in objs),
+        )
+    summary['digest'] = hashlib.sha256(
+        json.dumps(state, sort_keys=True).encode()
+    ).hexdigest()
+    return summary
+
+
+async def run_pass(
+    events: list[Event],
+    engine: str,
+    database_url: str,
+) -> tuple[dict, list[float]]:
+    if engine == MEMORY_ENGINE:
+        return replay_memory(events)
+    return await replay_database(events, engine, database_url)
+
+
+async def measure_peak_memory(
+    events: list[Event],
+    engine: str,
+    database_url: str,
+) -> int:
+    tracemalloc.start()
+    try:
+        await run_pass(events, engine, database_url)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def run_engine(
+    events: list[Event],
+    engine: str,
+    database_url: str = 'sqlite+aiosqlite://',
+    trace_memory: bool = True,
+) -> tuple[dict, dict]:
+    """
+    Прогнать журнал через `engine` и составить отчёт.
+
+    Пиковая память измеряется отдельным прогоном под `tracemalloc`,
+    чтобы его накладные расходы не искажали время.
+    """
+    started = time.perf_counter()
+    state, latencies = await run_pass(events, engine, database_url)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    report = dict(
+        events=len(events),
+        seconds=round(elapsed, 6),
+        events_per_second=round(len(events) / elapsed, 1) if elapsed else 0,
+        peak_memory_bytes=(
+            await measure_peak_memory(events, engine, database_url)
+            if trace_memory else None
+        ),
+        latency_ms={
+            f'p{rank}': round(percentile(latencies, rank) * 1000, 4)
+            for rank in PERCENTILES
+        } | dict(max=round(latencies[-1] * 1000, 4) if latencies else 0),
+        final_state=summarize(state),
+    )
+    return state, report
+
+
+async def replay(
+    events: list[Event],
+    engines: Iterable[str],
+    database_url: str = 'sqlite+aiosqlite://',
+    trace_memory: bool = True,
+) -> dict:
+    """Прогнать журнал через каждый механизм и сравнить итоги."""
+    reports, states = {}, {}
+    for engine in engines:
+        if engine != MEMORY_ENGINE and engine not in ENGINES:
+            raise ValueError(f'Неизвестный механизм инвестирования: {engine}')
+        states[engine], reports[engine] = await run_engine(
+            events, engine, database_url, trace_memory
+        )
+    reference: Optional[str] = next(iter(states), None)
+    mismatched = sorted(
+        engine for engine, state in states.items()
+        if state != states[reference]
+    )
+    return dict(
+        engines=reports,
+        reference=reference,
+        consistent=not mismatched,
+        mismatched=mismatched,
+    )
+
+
+async def load_from_db(database_url: str) -> list[Event]:
+    db_engine = create_async_engine(database_url)
+    try:
+        async with async_sessionmaker(db_engine)() as session:
+            return await export_events(session)
+    finally:
+        await db_engine.dispose()
+
+
+def parse_args(argv: Optional[list[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m app.replay',
+        description='Офлайн-прогон журнала событий инвестирования.',
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('log', nargs='?', help='журнал событий NDJSON')
+    source.add_argument('--from-db', metavar='URL', help='выгрузить из базы')
+    source.add_argument(
+        '--generate', metavar='N', type=int, help='сгенерировать N событий'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--engine',
+        action='append',
+        choices=[MEMORY_ENGINE, *ENGINES],
+        help='механизм инвестирования, можно указать несколько раз '
+             '(по умолчанию memory)',
+    )
+    parser.add_argument(
+        '--database',
+        default='sqlite+aiosqlite://',
+        help='пустая база для прогона механизмов, работающих с базой',
+    )
+    parser.add_argument(
+        '--export', metavar='PATH', help='сохранить журнал и не прогонять'
+    )
+    parser.add_argument(
+        '--no-memory',
+        action='store_true',
+        help='не измерять пиковую память (без второго прогона)',
+    )
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.log:
+        with open(args.log, encoding='utf-8') as stream:
+            events = read_events(stream)
+    elif args.from_db:
+        events = await load_from_db(args.from_db)
+    else:
+        events = generate_events(args.generate, args.seed)
+    if args.export:
+        with open(args.export, 'w', encoding='utf-8') as stream:
+            write_events(events, stream)
+        return 0
+    report = await replay(
+        events,
+        args.engine or [MEMORY_ENGINE],
+        args.database,
+        trace_memory=not args.no_memory,
+    )
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write('\n')
+    return 0 if report['consistent'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
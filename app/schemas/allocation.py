@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class AllocationDB(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    donation_id: int
+    project_id: int
+    amount: int
+    create_date: datetime
@@ -2,6 +2,8 @@ from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict, Field, PositiveInt
 
+from app.schemas.investment import AllocationSummary
+
 
 class CharityProjectBase(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -31,3 +33,8 @@ class CharityProjectDB(CharityProjectBase):
     fully_invested: bool
     create_date: datetime
     close_date: datetime | None = None
+
+
+class CharityProjectBulkResult(BaseModel):
+    items: list[CharityProjectDB]
+    summary: AllocationSummary
@@ -1,8 +1,11 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, PositiveInt
 
+from app.schemas.allocation import AllocationDB
+from app.schemas.investment import AllocationSummary
+
 
 class DonationCreate(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -34,3 +37,22 @@ class DonationUserDB(BaseModel):
     full_amount: int
     comment: str | None = None
     create_date: datetime
+
+
+class DonationBulkItem(DonationUserDB):
+    invested_amount: int
+    fully_invested: bool
+
+
+class DonationBulkResult(BaseModel):
+    items: list[DonationBulkItem]
+    summary: AllocationSummary
+
+
+class DonationAllocationStatus(BaseModel):
+    id: int
+    status: Literal['pending', 'allocated', 'failed']
+    full_amount: int
+    invested_amount: int
+    fully_invested: bool
+    allocations: list[AllocationDB]
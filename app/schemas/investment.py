@@ -0,0 +1,48 @@
+from pydantic import BaseModel
+
+
+class OpenPoolState(BaseModel):
+    count: int
+    total: int
+
+
+class OpenPoolCheck(BaseModel):
+    ledger: OpenPoolState
+    database: OpenPoolState
+    mismatched_ids: list[int]
+
+
+class LedgerCheck(BaseModel):
+    ready: bool
+    consistent: bool
+    charityproject: OpenPoolCheck
+    donation: OpenPoolCheck
+
+
+class AllocationSummary(BaseModel):
+    items: int
+    full_amount: int
+    invested_amount: int
+    unallocated_amount: int
+    closed_items: int
+    touched_counterparts: int
+    closed_counterparts: int
+
+
+class FundStatsDB(BaseModel):
+    total_raised: int
+    total_invested: int
+    total_unallocated: int
+    open_projects: int
+    closed_projects: int
+
+
+class ResponseCacheStats(BaseModel):
+    size: int
+    max_size: int
+    ttl: float
+    hits: int
+    misses: int
+    coalesced: int
+    evictions: int
+    invalidations: int
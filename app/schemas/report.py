@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ReportJobDB(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    status: Literal['pending', 'running', 'done', 'failed']
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    timings: dict[str, float]
+    url: Optional[str] = None
+    error: Optional[str] = None
@@ -0,0 +1,140 @@
+from itertools import chain
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.allocation import allocation_crud
+from app.services.investment import invest_batch, invest_funds
+from app.services.investment_sql import get_fifo_prefix, invest_funds_sql
+from app.services.ledger import open_pool_ledger
+from app.services.records import get_open_records, write_back
+
+
+async def allocate_python(session: AsyncSession, target, source_crud) -> None:
+    transfers = []
+    async for sources in source_crud.iter_opened(
+        session, settings.investment_chunk_size
+    ):
+        invest_funds(target, sources, transfers)
+        if target.fully_invested:
+            break
+    await allocation_crud.record(session, transfers)
+
+
+async def allocate_sql(session: AsyncSession, target, source_crud) -> None:
+    await invest_funds_sql(session, target, source_crud.model)
+
+
+async def get_ledger_sources(session: AsyncSession, source_crud, ids):
+    """
+    Объекты `ids` из плана резидентного учёта или None.
+
+    None возвращается, если хотя бы один объект закрыт, удалён или его
+    остаток не совпадает с учётом: тогда средства распределяются без
+    учёта, а разошедшийся с базой учёт перестраивается.
+    """
+    model = source_crud.model
+    queue = open_pool_ledger.queue(model)
+    sources = await source_crud.get_many(session, ids) if ids else []
+    found = {source.id: source for source in sources}
+    stale = [
+        obj_id for obj_id in ids
+        if obj_id not in found or not queue.matches(found[obj_id])
+    ]
+    if not stale:
+        return sources
+    if open_pool_ledger.drifted(session, model, stale):
+        await open_pool_ledger.build(session)
+    return None
+
+
+async def allocate_ledger(session: AsyncSession, target, source_crud) -> None:
+    if not open_pool_ledger.ready:
+        return await allocate_python(session, target, source_crud)
+    ids = open_pool_ledger.queue(source_crud.model).take(target.remaining)
+    sources = await get_ledger_sources(session, source_crud, ids)
+    if sources is None:
+        return await allocate_python(session, target, source_crud)
+    if sources:
+        transfers = []
+        invest_funds(target, sources, transfers)
+        await allocation_crud.record(session, transfers)
+
+
+async def allocate_slots(session: AsyncSession, target, source_crud) -> None:
+    records = await get_open_records(
+        session, source_crud.model, target.remaining
+    )
+    transfers = []
+    invest_funds(target, records, transfers)
+    await write_back(session, source_crud.model, records)
+    await allocation_crud.record(session, transfers)
+
+
+ENGINES = {
+    'python': allocate_python,
+    'sql': allocate_sql,
+    'ledger': allocate_ledger,
+    'slots': allocate_slots,
+}
+
+
+async def allocate(session: AsyncSession, target, source_crud) -> None:
+    """
+    Вложить средства `target` в открытые объекты `source_crud.model`.
+
+    Алгоритм выбирается настройкой `investment_engine`. Переводы
+    записываются в журнал распределения одним INSERT.
+    """
+    engine = ENGINES.get(settings.investment_engine)
+    if engine is None:
+        raise ValueError(
+            f'Неизвестный механизм инвестирования: '
+            f'{settings.investment_engine}'
+        )
+    await engine(session, target, source_crud)
+
+
+async def allocate_batch(
+    session: AsyncSession,
+    targets,
+    source_crud,
+    transfers: Optional[list] = None,
+) -> dict:
+    """
+    Вложить пачку новых `targets` в открытые объекты `source_crud.model`.
+
+    Из базы читается только голова очереди, которую покроет пачка:
+    по плану резидентного учёта или оконной функцией в базе; механизм
+    `slots` читает её без ORM и сохраняет одним UPDATE. Само
+    распределение выполняется одним проходом `invest_batch`.
+    Объекты пачки ещё не вставлены, поэтому переводы не записываются,
+    а дописываются в `transfers`. Возвращает сводку распределения.
+    """
+    amount = sum(target.remaining for target in targets)
+    sources = None
+    if settings.investment_engine == 'slots':
+        sources = await get_open_records(session, source_crud.model, amount)
+    elif settings.investment_engine == 'ledger' and open_pool_ledger.ready:
+        plan = open_pool_ledger.queue(source_crud.model).plan(
+            [target.remaining for target in targets]
+        )
+        ids = list(dict.fromkeys(chain.from_iterable(plan)))
+        sources = await get_ledger_sources(session, source_crud, ids)
+    if sources is None:
+        sources = await get_fifo_prefix(session, source_crud.model, amount)
+    changed = invest_batch(targets, sources, transfers)
+    if settings.investment_engine == 'slots':
+        await write_back(session, source_crud.model, sources)
+    full_amount = sum(target.full_amount for target in targets)
+    invested_amount = sum(target.invested_amount for target in targets)
+    return dict(
+        items=len(targets),
+        full_amount=full_amount,
+        invested_amount=invested_amount,
+        unallocated_amount=full_amount - invested_amount,
+        closed_items=sum(target.fully_invested for target in targets),
+        touched_counterparts=len(changed),
+        closed_counterparts=sum(source.fully_invested for source in changed),
+    )
@@ -0,0 +1,95 @@
+import asyncio
+from collections import OrderedDict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.services.allocation import allocate
+from app.services.versions import DONATIONS, PROJECTS, data_versions
+from app.services.writer import AllocationWriter, allocation_writer
+
+PENDING = 'pending'
+ALLOCATED = 'allocated'
+FAILED = 'failed'
+
+
+async def allocate_donation(session: AsyncSession, donation_id: int) -> None:
+    """Вложить сохранённое пожертвование в открытые проекты."""
+    donation = await donation_crud.get(session, donation_id)
+    if donation is not None and not donation.fully_invested:
+        await allocate(session, donation, charity_project_crud)
+
+
+class BackgroundAllocator:
+    """
+    Фоновое распределение принятых пожертвований.
+
+    Пожертвование сохраняется в запросе, а распределяется заданием
+    писателя `AllocationWriter` в порядке поступления. Состояние
+    последних `history_size` пожертвований хранится в памяти; ожидающие
+    распределения из истории не вытесняются.
+    """
+
+    def __init__(self, writer: AllocationWriter, history_size: int = 10000):
+        self.writer = writer
+        self.history_size = history_size
+        self.states: OrderedDict[int, str] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return (
+            settings.investment_mode == 'background' and self.writer.running
+        )
+
+    def _remember(self, donation_id: int, state: str) -> None:
+        self.states[donation_id] = state
+        self.states.move_to_end(donation_id)
+        while len(self.states) > self.history_size:
+            if next(iter(self.states.values())) == PENDING:
+                break
+            self.states.popitem(last=False)
+
+    def enqueue(self, donation_id: int) -> asyncio.Future:
+        async def job(session):
+            return await allocate_donation(session, donation_id)
+
+        def done(future):
+            if future.cancelled() or future.exception() is not None:
+                self._remember(donation_id, FAILED)
+            else:
+                self._remember(donation_id, ALLOCATED)
+                data_versions.bump(PROJECTS, DONATIONS)
+
+        self._remember(donation_id, PENDING)
+        future = self.writer.enqueue(job)
+        future.add_done_callback(done)
+        return future
+
+    def state(self, donation_id: int) -> str:
+        """
+        Состояние распределения пожертвования.
+
+        Пожертвования, о которых в памяти ничего нет, распределены
+        синхронно или до перезапуска.
+        """
+        return self.states.get(donation_id, ALLOCATED)
+
+    async def recover(self, session: AsyncSession) -> int:
+        """
+        Поставить в очередь пожертвования, не распределённые до остановки.
+
+        После каждого распределения открытыми могут остаться либо
+        пожертвования, либо проекты. Если открыто и то и другое, открытые
+        пожертвования ждут распределения.
+        """
+        if not await charity_project_crud.get_open_balances(session):
+            return 0
+        donations = await donation_crud.get_open_balances(session)
+        for donation in donations:
+            self.enqueue(donation.id)
+        return len(donations)
+
+
+background_allocator = BackgroundAllocator(allocation_writer)
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from app.core.config import settings
+from app.services.versions import PROJECTS, data_versions
+
+
+class ResponseCache:
+    """
+    Кэш сериализованных ответов в памяти процесса.
+
+    Хранит не больше `max_size` записей, вытесняя давно не читавшиеся,
+    каждая запись живёт не дольше `ttl` секунд. Записи сбрасываются
+    явно (`invalidate`) после фиксации изменений. Одновременные запросы
+    отсутствующей записи ждут одного построения.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.entries: OrderedDict[Hashable, tuple[float, Any]] = (
+            OrderedDict()
+        )
+        self.building: dict[Hashable, asyncio.Future] = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _lookup(self, key: Hashable):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value) -> None:
+        self.entries[key] = (self.clock() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _wait(self, pending: asyncio.Future) -> tuple[bool, Any]:
+        try:
+            return True, await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            # Построение отменено вместе со строившим запросом — строим
+            # заново, если отменили не нас самих.
+            if not pending.cancelled():
+                raise
+            return False, None
+
+    async def get_or_build(
+        self,
+        key: Hashable,
+        build: Callable[[], Awaitable],
+    ):
+        """
+        Значение `key` из кэша или результат `build()`.
+
+        Пока значение строится, остальные запросы того же ключа ждут его.
+        Значение, построенное до `invalidate`, возвращается вызывающим,
+        но в кэш не попадает.
+        """
+        while True:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            pending = self.building.get(key)
+            if pending is None:
+                break
+            self.coalesced += 1
+            built, value = await self._wait(pending)
+            if built:
+                return value
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(
+            lambda done: done.cancelled() or done.exception()
+        )
+        self.building[key] = future
+        generation = self.generation
+        try:
+            value = await build()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            raise
+        finally:
+            if self.building.get(key) is future:
+                del self.building[key]
+        if generation == self.generation:
+            self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def invalidate(self) -> None:
+        """Сбросить все записи и не сохранять уже начатые построения."""
+        self.entries.clear()
+        self.building.clear()
+        self.generation += 1
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        return dict(
+            size=len(self.entries),
+            max_size=self.max_size,
+            ttl=self.ttl,
+            hits=self.hits,
+            misses=self.misses,
+            coalesced=self.coalesced,
+            evictions=self.evictions,
+            invalidations=self.invalidations,
+        )
+
+
+project_cache = ResponseCache(
+    settings.response_cache_size, settings.response_cache_ttl
+)
+data_versions.subscribe(PROJECTS, project_cache.invalidate)
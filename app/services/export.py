@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Literal
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.constants import EXPORT_CHUNK_SIZE
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+ExportFormat = Literal['ndjson', 'csv']
+MEDIA_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv; charset=utf-8',
+}
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(type(value).__name__)
+
+
+def encode_ndjson(fields: Sequence[str], rows) -> str:
+    return ''.join(
+        json.dumps(dict(zip(fields, row)), default=_default,
+                   ensure_ascii=False) + '\n'
+        for row in rows
+    )
+
+
+def encode_csv(fields: Sequence[str], rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    writer.writerows(
+        [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row
+        ]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+async def stream_export(
+    session_factory: async_sessionmaker,
+    model,
+    fields: Sequence[str],
+    export_format: str,
+) -> AsyncIterator[bytes]:
+    """
+    Все строки `model` по возрастанию `id` порциями по `EXPORT_CHUNK_SIZE`.
+
+    Читаются только столбцы `fields` через `AsyncSession.stream`, поэтому
+    в памяти одновременно находится не больше одной порции.
+    """
+    if export_format == CSV:
+        yield encode_csv(fields, (), header=True).encode()
+    async with session_factory() as session:
+        result = await session.stream(
+            select(*(getattr(model, field) for field in fields))
+            .order_by(model.id)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        async for rows in result.partitions():
+            if export_format == CSV:
+                yield encode_csv(fields, rows).encode()
+            else:
+                yield encode_ndjson(fields, rows).encode()
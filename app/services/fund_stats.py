@@ -0,0 +1,172 @@
+"""
+Сводные показатели фонда, поддерживаемые в той же транзакции.
+
+Изменения объектов ORM учитываются по событиям сессии, изменения в
+обход ORM (UPDATE механизмов `sql` и `slots`, пакетная вставка) —
+явными вызовами. Накопленная разница применяется одним UPDATE перед
+фиксацией транзакции.
+
+    python -m app.services.fund_stats  # пересчитать показатели заново
+"""
+import asyncio
+
+from sqlalchemy import Select, event, func, insert, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, attributes
+
+from app.core.db import AsyncSessionLocal
+from app.models import CharityProject, Donation, FundStats
+from app.models.fund_stats import FUND_STATS_ID
+
+PENDING_KEY = 'fund_stats'
+COUNTERS = ('total_raised', 'total_invested', 'open_projects',
+            'closed_projects')
+
+
+def add_delta(session, **delta) -> None:
+    pending = session.info.setdefault(
+        PENDING_KEY, dict.fromkeys(COUNTERS, 0)
+    )
+    for counter, value in delta.items():
+        pending[counter] += value
+
+
+def count_created(session, objects, sign: int = 1) -> None:
+    """Учесть новые (или, при `sign=-1`, удалённые) объекты."""
+    for obj in objects:
+        if isinstance(obj, Donation):
+            add_delta(
+                session,
+                total_raised=sign * obj.full_amount,
+                total_invested=sign * obj.invested_amount,
+            )
+        elif isinstance(obj, CharityProject):
+            counter = (
+                'closed_projects' if obj.fully_invested else 'open_projects'
+            )
+            add_delta(session, **{counter: sign})
+
+
+def count_core_update(session, model, invested: int, closed: int) -> None:
+    """
+    Учесть источники `model`, обновлённые в обход ORM.
+
+    Вложенные средства считаются по пожертвованиям, закрытые объекты —
+    по проектам.
+    """
+    if model is Donation:
+        add_delta(session, total_invested=invested)
+    elif model is CharityProject:
+        add_delta(session, open_projects=-closed, closed_projects=closed)
+
+
+def count_dirty(session, obj) -> None:
+    if isinstance(obj, Donation):
+        history = attributes.get_history(obj, 'invested_amount')
+        if history.added and history.deleted:
+            add_delta(
+                session,
+                total_invested=history.added[0] - history.deleted[0],
+            )
+    elif isinstance(obj, CharityProject):
+        history = attributes.get_history(obj, 'fully_invested')
+        if history.added and history.deleted:
+            closed = int(history.added[0]) - int(history.deleted[0])
+            add_delta(
+                session, open_projects=-closed, closed_projects=closed
+            )
+
+
+def totals_query() -> Select:
+    """Показатели, пересчитанные по всем строкам."""
+    return select(
+        select(func.coalesce(func.sum(Donation.full_amount), 0))
+        .scalar_subquery().label('total_raised'),
+        select(func.coalesce(func.sum(Donation.invested_amount), 0))
+        .scalar_subquery().label('total_invested'),
+        select(func.count()).select_from(CharityProject)
+        .where(CharityProject.is_open())
+        .scalar_subquery().label('open_projects'),
+        select(func.count()).select_from(CharityProject)
+        .where(CharityProject.fully_invested == true())
+        .scalar_subquery().label('closed_projects'),
+    )
+
+
+@event.listens_for(Session, 'after_flush')
+def collect_stats(session: Session, flush_context) -> None:
+    count_created(session, session.new)
+    for obj in session.dirty:
+        count_dirty(session, obj)
+    count_created(session, session.deleted, sign=-1)
+
+
+@event.listens_for(Session, 'before_commit')
+def apply_stats(session: Session) -> None:
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending or not any(pending.values()):
+        return
+    result = session.execute(
+        update(FundStats)
+        .where(FundStats.id == FUND_STATS_ID)
+        .values({
+            counter: getattr(FundStats, counter) + value
+            for counter, value in pending.items()
+        })
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        # Строки ещё нет: показатели считаются заново вместе с текущими
+        # изменениями.
+        totals = session.execute(totals_query()).one()
+        session.execute(
+            insert(FundStats).values(id=FUND_STATS_ID, **totals._asdict())
+        )
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_stats(session: Session) -> None:
+    session.info.pop(PENDING_KEY, None)
+
+
+def as_dict(stats: FundStats) -> dict:
+    return dict(
+        total_raised=stats.total_raised,
+        total_invested=stats.total_invested,
+        total_unallocated=stats.total_raised - stats.total_invested,
+        open_projects=stats.open_projects,
+        closed_projects=stats.closed_projects,
+    )
+
+
+async def reconcile(session: AsyncSession) -> dict:
+    """Пересчитать показатели по всем строкам и сохранить их."""
+    totals = (await session.execute(totals_query())).one()._asdict()
+    stats = await session.get(FundStats, FUND_STATS_ID)
+    if stats is None:
+        stats = FundStats(id=FUND_STATS_ID)
+        session.add(stats)
+    for counter, value in totals.items():
+        setattr(stats, counter, value)
+    await session.commit()
+    return as_dict(stats)
+
+
+async def get_stats(session: AsyncSession) -> dict:
+    stats = await session.get(
+        FundStats, FUND_STATS_ID, populate_existing=True
+    )
+    if stats is None:
+        return await reconcile(session)
+    return as_dict(stats)
+
+
+async def main() -> None:
+    async with AsyncSessionLocal() as session:
+        print(await reconcile(session))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
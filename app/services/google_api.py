@@ -1,11 +1,16 @@
+import asyncio
+from collections.abc import AsyncIterator
 from copy import deepcopy
 from datetime import datetime
+from typing import Optional
 
 from aiogoogle import Aiogoogle
+from aiogoogle.resource import GoogleAPI
 
 from app.core.config import settings
 from app.core.constants import (DATE_FORMAT, HOURS_IN_DAY, MINUTES_IN_HOUR,
                                 SECONDS_IN_MINUTE, TABLE_VALUES)
+from app.services.google_discovery import DRIVE, SHEETS, discovery_cache
 
 SPREADSHEET_BODY_TEMPLATE = dict(
     properties=dict(
@@ -49,19 +54,62 @@ async def format_data_report(projects):
     return table_values
 
 
+def cell_data(value) -> dict:
+    """Ячейка `CellData` со значением `value`."""
+    if value is None:
+        return {}
+    if isinstance(value, bool):
+        return dict(userEnteredValue=dict(boolValue=value))
+    if isinstance(value, (int, float)):
+        return dict(userEnteredValue=dict(numberValue=value))
+    return dict(userEnteredValue=dict(stringValue=str(value)))
+
+
+def grid_data(table_values: list) -> dict:
+    """Данные листа `GridData` начиная с ячейки A1."""
+    return dict(
+        startRow=0,
+        startColumn=0,
+        rowData=[
+            dict(values=[cell_data(value) for value in row])
+            for row in table_values
+        ],
+    )
+
+
 async def spreadsheets_create(
     wrapper_service: Aiogoogle,
     spreadsheet_template: dict = SPREADSHEET_BODY_TEMPLATE,
+    service: Optional[GoogleAPI] = None,
+    table_values: Optional[list] = None,
+    grid_size: Optional[tuple[int, int]] = None,
 ):
-    service = await wrapper_service.discover('sheets', 'v4')
+    """
+    Создать таблицу отчёта.
+
+    Если переданы `table_values`, они записываются на лист в том же
+    запросе. Сетка листа — `grid_size` (строки, столбцы), а без него
+    выбирается по размеру `table_values`.
+    """
+    if service is None:
+        service = await discovery_cache.get(wrapper_service, *SHEETS)
     now_date_time = datetime.now().strftime(DATE_FORMAT)
 
     body = deepcopy(spreadsheet_template)
     body['properties']['title'] = f'Отчет на {now_date_time}'
 
-    # rowCount/columnCount не выставляем
-    grid_properties = body['sheets'][0]['properties'].get('gridProperties')
-    if grid_properties:
+    sheet = body['sheets'][0]
+    grid_properties = sheet['properties'].get('gridProperties')
+    if table_values:
+        sheet['data'] = [grid_data(table_values)]
+        if grid_size is None:
+            grid_size = len(table_values), max(map(len, table_values))
+    if grid_size is not None and grid_properties is not None:
+        grid_properties['rowCount'], grid_properties['columnCount'] = (
+            grid_size
+        )
+    elif grid_properties:
+        # rowCount/columnCount не выставляем
         grid_properties.pop('rowCount', None)
         grid_properties.pop('columnCount', None)
 
@@ -73,9 +121,11 @@ async def spreadsheets_create(
 
 async def set_user_permissions(
     spreadsheet_id: str,
-    wrapper_services: Aiogoogle
+    wrapper_services: Aiogoogle,
+    service: Optional[GoogleAPI] = None,
 ) -> None:
-    service = await wrapper_services.discover('drive', 'v3')
+    if service is None:
+        service = await discovery_cache.get(wrapper_services, *DRIVE)
     await wrapper_services.as_service_account(
         service.permissions.create(
             fileId=spreadsheet_id,
@@ -93,16 +143,65 @@ async def spreadsheets_update_value(
     wrapper_services: Aiogoogle,
     spreadsheet_id: str,
     table_values: list,
+    service: Optional[GoogleAPI] = None,
+    start_row: int = 1,
+    value_input_option: str = 'USER_ENTERED',
 ) -> None:
-    service = await wrapper_services.discover('sheets', 'v4')
+    if service is None:
+        service = await discovery_cache.get(wrapper_services, *SHEETS)
     await wrapper_services.as_service_account(
         service.spreadsheets.values.update(
             spreadsheetId=spreadsheet_id,
-            range='A1',
-            valueInputOption='USER_ENTERED',
+            range=f'A{start_row}',
+            valueInputOption=value_input_option,
             json=dict(
                 majorDimension='ROWS',
                 values=table_values
             )
         )
     )
+
+
+async def spreadsheets_write_chunks(
+    wrapper_services: Aiogoogle,
+    spreadsheet_id: str,
+    chunks: AsyncIterator[list],
+    start_row: int,
+    service: GoogleAPI,
+    max_in_flight: int,
+) -> int:
+    """
+    Записать порции строк подряд начиная со строки `start_row`.
+
+    Каждая порция пишется отдельным `values.update` в свой диапазон,
+    одновременно выполняется не больше `max_in_flight` записей.
+    Следующая порция читается, только когда освободилось место, поэтому
+    в памяти не больше `max_in_flight + 1` порций. Возвращает число
+    записанных строк.
+    """
+    semaphore = asyncio.Semaphore(max_in_flight)
+    written = 0
+
+    async def write(rows, row):
+        try:
+            await spreadsheets_update_value(
+                wrapper_services,
+                spreadsheet_id,
+                rows,
+                service=service,
+                start_row=row,
+                value_input_option='RAW',
+            )
+        finally:
+            semaphore.release()
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            async for rows in chunks:
+                await semaphore.acquire()
+                group.create_task(write(rows, start_row + written))
+                written += len(rows)
+    except ExceptionGroup as errors:
+        # Остальные записи уже отменены: наружу — первая ошибка.
+        raise errors.exceptions[0]
+    return written
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+
+from aiogoogle import Aiogoogle
+from aiogoogle.resource import GoogleAPI
+
+from app.core.config import settings
+
+SHEETS = ('sheets', 'v4')
+DRIVE = ('drive', 'v3')
+
+
+class DiscoveryCache:
+    """
+    Документы обнаружения Google API на всё время жизни процесса.
+
+    Документ читается с диска, если копия моложе `max_age` секунд, иначе
+    загружается заново и сохраняется в `directory`. Если загрузить
+    документ не удалось, используется устаревшая копия с диска.
+    """
+
+    def __init__(self, directory, max_age: float):
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self.services: dict[tuple[str, str], GoogleAPI] = {}
+        self.lock = asyncio.Lock()
+        self.fetches = 0
+
+    def path(self, api_name: str, api_version: str) -> Path:
+        return self.directory / f'{api_name}.{api_version}.json'
+
+    def _read(self, path: Path, fresh_only: bool):
+        try:
+            if fresh_only and time.time() - path.stat().st_mtime > (
+                self.max_age
+            ):
+                return None
+            return json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path: Path, document: dict) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix('.tmp')
+            temporary.write_text(json.dumps(document), encoding='utf-8')
+            os.replace(temporary, path)
+        except OSError:
+            # Копия на диске — только ускорение: без неё документ
+            # загрузится при следующем запуске.
+            pass
+
+    async def _fetch(self, aiogoogle: Aiogoogle, api_name, api_version):
+        self.fetches += 1
+        return await aiogoogle.as_anon(
+            aiogoogle.discovery_service.apis.getRest(
+                api=api_name, version=api_version, validate=False
+            )
+        )
+
+    async def _load(self, aiogoogle: Aiogoogle, api_name, api_version):
+        path = self.path(api_name, api_version)
+        document = self._read(path, fresh_only=True)
+        if document is not None:
+            return document
+        try:
+            document = await self._fetch(aiogoogle, api_name, api_version)
+        except Exception:
+            document = self._read(path, fresh_only=False)
+            if document is None:
+                raise
+            return document
+        self._write(path, document)
+        return document
+
+    async def get(
+        self,
+        aiogoogle: Aiogoogle,
+        api_name: str,
+        api_version: str,
+    ) -> GoogleAPI:
+        """Сервис `api_name` версии `api_version`, как у `discover`."""
+        key = (api_name, api_version)
+        if key not in self.services:
+            async with self.lock:
+                if key not in self.services:
+                    self.services[key] = GoogleAPI(
+                        await self._load(aiogoogle, api_name, api_version)
+                    )
+        return self.services[key]
+
+
+discovery_cache = DiscoveryCache(
+    settings.google_discovery_dir, settings.google_discovery_max_age
+)
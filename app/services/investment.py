@@ -1,11 +1,21 @@
 from datetime import datetime
-from typing import Iterable, List, TypeVar
+from typing import Iterable, List, Optional, Sequence, TypeVar
 
 TARGET = TypeVar("T")
 SOURCE = TypeVar("S")
 
 
-def invest_funds(target: TARGET, sources: Iterable[SOURCE]) -> List[SOURCE]:
+def invest_funds(
+    target: TARGET,
+    sources: Iterable[SOURCE],
+    transfers: Optional[list] = None,
+) -> List[SOURCE]:
+    """
+    Вкладывает средства `target` в `sources` по очереди.
+
+    Возвращает затронутые источники; если передан список `transfers`,
+    в него дописываются переводы (`target`, `source`, сумма).
+    """
     changed: List[SOURCE] = []
     now = datetime.now()
 
@@ -33,8 +43,43 @@ def invest_funds(target: TARGET, sources: Iterable[SOURCE]) -> List[SOURCE]:
                 obj.close_date = now
 
         changed.append(source)
+        if transfers is not None:
+            transfers.append((target, source, to_invest))
 
         if target.fully_invested:
             break
 
     return changed
+
+
+def invest_batch(
+    targets: Iterable[TARGET],
+    sources: Sequence[SOURCE],
+    transfers: Optional[list] = None,
+) -> List[SOURCE]:
+    """
+    Вкладывает пачку `targets` в очередь `sources` за один проход.
+
+    Результат совпадает с последовательными вызовами `invest_funds`
+    для каждого объекта из `targets`: указатель на первый открытый
+    источник только продвигается вперёд. Переводы, как и в
+    `invest_funds`, дописываются в `transfers`.
+    """
+    changed: dict = {}
+    position = 0
+
+    for target in targets:
+        if position == len(sources):
+            break
+        for source in invest_funds(
+            target,
+            (sources[i] for i in range(position, len(sources))),
+            transfers,
+        ):
+            changed[id(source)] = source
+        while (
+            position < len(sources) and sources[position].fully_invested
+        ):
+            position += 1
+
+    return list(changed.values())
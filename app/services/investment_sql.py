@@ -0,0 +1,177 @@
+from datetime import datetime
+
+from sqlalchemy import Subquery, case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.crud.allocation import allocation_crud
+from app.services.fund_stats import count_core_update
+
+
+def fifo_window(model) -> Subquery:
+    """
+    Открытые объекты модели в порядке FIFO с накопленной суммой остатков.
+
+    `position` — порядковый номер в очереди, `cumulative` — сумма
+    `remaining` всех объектов очереди до текущего включительно.
+    """
+    remaining = model.full_amount - model.invested_amount
+    order = (model.create_date, model.id)
+    return (
+        select(
+            model.id,
+            model.version,
+            remaining.label('remaining'),
+            func.row_number().over(order_by=order).label('position'),
+            func.sum(remaining).over(
+                order_by=order, rows=(None, 0)
+            ).label('cumulative'),
+        )
+        .where(model.is_open())
+        .subquery()
+    )
+
+
+async def get_fifo_prefix(
+    session: AsyncSession,
+    model,
+    amount: int,
+) -> list:
+    """
+    Открытые объекты `model` из головы очереди, которые покроют `amount`.
+
+    Возвращаются все объекты, накопленный остаток перед которыми
+    меньше `amount`, — ровно те, что затронет распределение этой суммы.
+    """
+    window = fifo_window(model)
+    result = await session.execute(
+        select(model)
+        .join(window, model.id == window.c.id)
+        .where(window.c.cumulative - window.c.remaining < amount)
+        .order_by(window.c.position)
+    )
+    return list(result.scalars().all())
+
+
+async def invest_funds_sql(
+    session: AsyncSession,
+    target,
+    source_model,
+) -> int:
+    """
+    Распределяет средства `target` по открытым объектам `source_model`.
+
+    Результат совпадает с `invest_funds`, но точка отсечения очереди
+    вычисляется в базе оконной функцией, а источники обновляются
+    несколькими UPDATE-запросами вместо UPDATE на каждую строку.
+    UPDATE применяются, только если очередь не изменилась после чтения,
+    иначе поднимается `StaleDataError`. Переводы записываются в журнал
+    распределения одним INSERT ... SELECT по той же оконной выборке.
+    Возвращает вложенную сумму.
+    """
+    need = target.remaining
+    if need <= 0:
+        return 0
+
+    now = datetime.now()
+    window = fifo_window(source_model)
+    boundary = (
+        await session.execute(
+            select(
+                window.c.id,
+                window.c.remaining,
+                window.c.position,
+                window.c.cumulative,
+                window.c.version,
+            )
+            .where(window.c.cumulative >= need)
+            .order_by(window.c.position)
+            .limit(1)
+        )
+    ).first()
+
+    if boundary is None:
+        # Открытых средств не хватает: закрываются все источники.
+        invested, expected = (
+            await session.execute(
+                select(
+                    func.coalesce(func.sum(window.c.remaining), 0),
+                    func.count(),
+                )
+            )
+        ).one()
+        closed = select(window.c.id)
+        unchanged = select(
+            func.coalesce(func.sum(window.c.remaining), 0)
+        ).scalar_subquery() == invested
+    else:
+        invested = need
+        expected = boundary.position
+        closed_cumulative = boundary.cumulative
+        if boundary.cumulative > need:
+            expected -= 1
+            closed_cumulative -= boundary.remaining
+        closed = select(window.c.id).where(window.c.position <= expected)
+        unchanged = select(window.c.cumulative).where(
+            window.c.position == expected
+        ).scalar_subquery() == closed_cumulative
+
+    before = window.c.cumulative - window.c.remaining
+    await allocation_crud.record_from_select(
+        session,
+        target,
+        select(
+            window.c.id,
+            case(
+                (window.c.cumulative > need, need - before),
+                else_=window.c.remaining,
+            ),
+        ).where(before < need, window.c.remaining > 0),
+    )
+
+    if expected:
+        result = await session.execute(
+            update(source_model)
+            .where(source_model.id.in_(closed), unchanged)
+            .values(
+                invested_amount=source_model.full_amount,
+                fully_invested=True,
+                close_date=now,
+                version=source_model.version + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != expected:
+            raise StaleDataError(
+                f'Очередь {source_model.__tablename__} изменилась '
+                f'во время распределения.'
+            )
+
+    if boundary is not None and boundary.cumulative > need:
+        result = await session.execute(
+            update(source_model)
+            .where(
+                source_model.id == boundary.id,
+                source_model.version == boundary.version,
+            )
+            .values(
+                invested_amount=(
+                    source_model.invested_amount +
+                    need - (boundary.cumulative - boundary.remaining)
+                ),
+                version=source_model.version + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            raise StaleDataError(
+                f'Объект {source_model.__tablename__} {boundary.id} '
+                f'изменился во время распределения.'
+            )
+
+    count_core_update(session, source_model, invested, expected)
+    target.invested_amount += invested
+    if target.remaining == 0:
+        target.fully_invested = True
+        target.close_date = now
+    return invested
@@ -0,0 +1,298 @@
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from itertools import accumulate, chain
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.models.base_model import InvestedBase
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PENDING_KEY = 'open_pool_ledger'
+
+
+class OpenQueue:
+    """
+    FIFO-очередь открытых объектов одной модели с индексом накопленных сумм.
+
+    `prefix[i]` — накопленная сумма остатков от начала массива до позиции
+    `i` включительно. Поглощённая голова очереди не удаляется сразу, а
+    учитывается сдвигом `offset`, поэтому объекты, которые покроют сумму,
+    находятся бинарным поиском, а распределение меняет только
+    затронутые позиции.
+    """
+
+    COMPACT_THRESHOLD = 1024
+
+    def __init__(self):
+        self.keys: list[tuple[datetime, int]] = []
+        self.prefix = array('q')
+        self.dates: dict[int, datetime] = {}
+        self.start = 0
+        self.offset = 0
+
+    def __len__(self) -> int:
+        return len(self.keys) - self.start
+
+    @property
+    def total(self) -> int:
+        if not len(self):
+            return 0
+        return self.prefix[-1] - self.offset
+
+    def _index(self, obj_id: int) -> int:
+        return bisect_left(
+            self.keys, (self.dates[obj_id], obj_id), self.start
+        )
+
+    def _remaining(self, index: int) -> int:
+        before = self.prefix[index - 1] if index > self.start else self.offset
+        return self.prefix[index] - before
+
+    def _shift(self, index: int, delta: int) -> None:
+        """Сдвинуть накопленные суммы начиная с позиции `index`."""
+        if not delta or index >= len(self.prefix):
+            return
+        if np is not None:
+            view = np.frombuffer(self.prefix, dtype=np.int64)
+            view[index:] += delta
+            del view
+            return
+        for position in range(index, len(self.prefix)):
+            self.prefix[position] += delta
+
+    def _compact(self) -> None:
+        if self.start == len(self.keys):
+            self.keys, self.prefix = [], array('q')
+            self.start = self.offset = 0
+        elif (
+            self.start >= self.COMPACT_THRESHOLD and
+            self.start * 2 >= len(self.keys)
+        ):
+            del self.keys[:self.start]
+            self.prefix = self.prefix[self.start:]
+            self.start = 0
+
+    def put(self, obj_id: int, create_date: datetime, remaining: int):
+        if obj_id in self.dates:
+            index = self._index(obj_id)
+            delta = remaining - self._remaining(index)
+            if index == self.start:
+                self.offset -= delta
+            else:
+                self._shift(index, delta)
+            return
+        key = (create_date, obj_id)
+        self.dates[obj_id] = create_date
+        if not len(self) or self.keys[-1] < key:
+            last = self.prefix[-1] if self.prefix else self.offset
+            self.keys.append(key)
+            self.prefix.append(last + remaining)
+            return
+        index = bisect_left(self.keys, key, self.start)
+        before = self.prefix[index - 1] if index > self.start else self.offset
+        self.keys.insert(index, key)
+        self.prefix.insert(index, before + remaining)
+        self._shift(index + 1, remaining)
+
+    def discard(self, obj_id: int) -> None:
+        if obj_id not in self.dates:
+            return
+        index = self._index(obj_id)
+        del self.dates[obj_id]
+        if index == self.start:
+            self.offset = self.prefix[index]
+            self.start += 1
+            self._compact()
+            return
+        remaining = self._remaining(index)
+        del self.keys[index]
+        del self.prefix[index]
+        self._shift(index, -remaining)
+
+    def _ids(self, start: int, stop: int) -> list[int]:
+        return [obj_id for _, obj_id in self.keys[start:stop]]
+
+    def take(self, amount: int) -> list[int]:
+        """
+        `id` объектов из головы очереди, которые покроют `amount`.
+
+        Очередь не изменяется: она обновится после фиксации транзакции.
+        """
+        if amount <= 0 or not len(self):
+            return []
+        cut = bisect_left(self.prefix, self.offset + amount, self.start)
+        return self._ids(self.start, cut + 1)
+
+    def plan(self, amounts: list[int]) -> list[list[int]]:
+        """
+        `id` объектов, которые затронет каждая сумма пачки.
+
+        Суммы распределяются последовательно, как в `invest_batch`;
+        точки отсечения для всей пачки ищутся одним вызовом
+        `numpy.searchsorted`, а без numpy — бинарным поиском.
+        """
+        bounds = list(accumulate(amounts, initial=self.offset))[1:]
+        if np is not None:
+            view = np.frombuffer(self.prefix, dtype=np.int64)
+            cuts = (
+                np.searchsorted(view[self.start:], bounds, side='left') +
+                self.start
+            ).tolist()
+            del view
+        else:
+            cuts = [
+                bisect_left(self.prefix, bound, self.start)
+                for bound in bounds
+            ]
+        plan = []
+        begin = self.start
+        for bound, cut in zip(bounds, cuts):
+            plan.append(self._ids(begin, cut + 1))
+            if cut < len(self.prefix) and self.prefix[cut] == bound:
+                cut += 1
+            begin = cut
+        return plan
+
+    def balance(self, obj_id: int) -> Optional[int]:
+        """Остаток объекта по учёту или None, если его нет в очереди."""
+        if obj_id not in self.dates:
+            return None
+        return self._remaining(self._index(obj_id))
+
+    def matches(self, source) -> bool:
+        """Открыт ли объект из базы и совпадает ли его остаток с учётом."""
+        return (
+            not source.fully_invested and
+            source.remaining == self.balance(source.id)
+        )
+
+    def balances(self) -> dict[int, int]:
+        return {
+            self.keys[index][1]: self._remaining(index)
+            for index in range(self.start, len(self.keys))
+        }
+
+
+class OpenPoolLedger:
+    """
+    Резидентный учёт открытых проектов и пожертвований.
+
+    Строится при старте приложения и обновляется после каждой
+    зафиксированной транзакции, изменившей проекты или пожертвования.
+    """
+
+    def __init__(self, cruds):
+        self.cruds = cruds
+        self.queues = {crud.model: OpenQueue() for crud in cruds}
+        self.ready = False
+
+    def queue(self, model) -> OpenQueue:
+        return self.queues[model]
+
+    async def build(self, session: AsyncSession) -> None:
+        self.ready = False
+        queues = {}
+        for crud in self.cruds:
+            queue = OpenQueue()
+            for row in await crud.get_open_balances(session):
+                queue.put(row.id, row.create_date, row.remaining)
+            queues[crud.model] = queue
+        self.queues = queues
+        self.ready = True
+
+    def drifted(self, session, model, ids) -> bool:
+        """
+        Разошёлся ли учёт с базой по объектам `ids`.
+
+        Объекты, изменённые ещё не зафиксированной транзакцией `session`,
+        расхождением не считаются: учёт обновится после её фиксации.
+        """
+        pending = session.info.get(PENDING_KEY, {})
+        return any((model, obj_id) not in pending for obj_id in ids)
+
+    def apply(self, changes: dict) -> None:
+        for (model, obj_id), state in changes.items():
+            queue = self.queues[model]
+            if state is None:
+                queue.discard(obj_id)
+                continue
+            create_date, remaining, fully_invested = state
+            if fully_invested:
+                queue.discard(obj_id)
+            else:
+                queue.put(obj_id, create_date, remaining)
+
+    async def check(self, session: AsyncSession) -> dict:
+        """Сверка с базой данных: остатки каждого открытого объекта."""
+        report = dict(ready=self.ready, consistent=self.ready)
+        for crud in self.cruds:
+            database = {
+                row.id: row.remaining
+                for row in await crud.get_open_balances(session)
+            }
+            ledger = self.queues[crud.model].balances()
+            mismatched = sorted(
+                obj_id for obj_id in database.keys() | ledger.keys()
+                if database.get(obj_id) != ledger.get(obj_id)
+            )
+            report[crud.model.__tablename__] = dict(
+                ledger=dict(count=len(ledger), total=sum(ledger.values())),
+                database=dict(
+                    count=len(database), total=sum(database.values())
+                ),
+                mismatched_ids=mismatched,
+            )
+            report['consistent'] = report['consistent'] and not mismatched
+        return report
+
+
+open_pool_ledger = OpenPoolLedger((charity_project_crud, donation_crud))
+
+
+def track_changes(session, objects) -> None:
+    """
+    Запомнить состояние объектов до фиксации транзакции.
+
+    Нужен для объектов, записанных в обход единицы работы ORM.
+    """
+    if not open_pool_ledger.ready:
+        return
+    pending = session.info.setdefault(PENDING_KEY, {})
+    for obj in objects:
+        if isinstance(obj, InvestedBase):
+            pending[type(obj), obj.id] = (
+                obj.create_date, obj.remaining, obj.fully_invested
+            )
+
+
+@event.listens_for(Session, 'after_flush')
+def collect_changes(session: Session, flush_context) -> None:
+    if not open_pool_ledger.ready:
+        return
+    track_changes(session, chain(session.new, session.dirty))
+    pending = session.info[PENDING_KEY]
+    for obj in session.deleted:
+        if isinstance(obj, InvestedBase):
+            pending[type(obj), obj.id] = None
+
+
+@event.listens_for(Session, 'after_commit')
+def apply_changes(session: Session) -> None:
+    changes = session.info.pop(PENDING_KEY, None)
+    if changes and open_pool_ledger.ready:
+        open_pool_ledger.apply(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_changes(session: Session) -> None:
+    session.info.pop(PENDING_KEY, None)
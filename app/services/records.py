@@ -0,0 +1,125 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.services.fund_stats import count_core_update
+from app.services.investment_sql import fifo_window
+
+
+class OpenRecord:
+    """
+    Открытый проект или пожертвование без инструментовки ORM.
+
+    Подходит для `invest_funds` вместо объектов модели: изменения
+    атрибутов не проходят через события и учёт изменений сессии.
+    """
+
+    __slots__ = (
+        'id', 'version', 'full_amount', 'invested_amount', 'loaded_amount',
+        'fully_invested', 'close_date',
+    )
+
+    def __init__(
+        self,
+        id: int,
+        version: int,
+        full_amount: int,
+        invested_amount: int,
+    ):
+        self.id = id
+        self.version = version
+        self.full_amount = full_amount
+        self.invested_amount = invested_amount
+        self.loaded_amount = invested_amount
+        self.fully_invested = False
+        self.close_date: Optional[datetime] = None
+
+    @property
+    def remaining(self) -> int:
+        return self.full_amount - self.invested_amount
+
+    @property
+    def changed(self) -> bool:
+        return (
+            self.fully_invested or self.invested_amount != self.loaded_amount
+        )
+
+
+async def get_open_records(
+    session: AsyncSession,
+    model,
+    amount: int,
+) -> list[OpenRecord]:
+    """
+    Голова очереди открытых объектов `model`, которая покроет `amount`.
+
+    Те же объекты, что и у `get_fifo_prefix`, но читаются только
+    нужные столбцы, а сущности ORM не создаются.
+    """
+    window = fifo_window(model)
+    result = await session.execute(
+        select(
+            model.id, model.version, model.full_amount, model.invested_amount
+        )
+        .join(window, model.id == window.c.id)
+        .where(window.c.cumulative - window.c.remaining < amount)
+        .order_by(window.c.position)
+    )
+    return [OpenRecord(*row) for row in result.all()]
+
+
+async def write_back(
+    session: AsyncSession,
+    model,
+    records: list[OpenRecord],
+) -> None:
+    """
+    Сохранить изменённые записи одним executemany UPDATE по `id`.
+
+    Каждая строка обновляется, только если её версия не изменилась
+    после чтения, иначе поднимается `StaleDataError`.
+    """
+    rows = [
+        dict(
+            b_id=record.id,
+            b_version=record.version,
+            b_invested_amount=record.invested_amount,
+            b_fully_invested=record.fully_invested,
+            b_close_date=record.close_date,
+        )
+        for record in records if record.changed
+    ]
+    if not rows:
+        return
+    table = model.__table__
+    result = await session.execute(
+        update(table)
+        .where(
+            table.c.id == bindparam('b_id'),
+            table.c.version == bindparam('b_version'),
+        )
+        .values(
+            invested_amount=bindparam('b_invested_amount'),
+            fully_invested=bindparam('b_fully_invested'),
+            close_date=bindparam('b_close_date'),
+            version=table.c.version + 1,
+        ),
+        rows,
+    )
+    if result.rowcount != len(rows):
+        raise StaleDataError(
+            f'Объекты {model.__tablename__} изменились '
+            f'во время распределения.'
+        )
+    count_core_update(
+        session,
+        model,
+        invested=sum(
+            record.invested_amount - record.loaded_amount
+            for record in records
+        ),
+        closed=sum(record.fully_invested for record in records),
+    )
@@ -0,0 +1,205 @@
+"""
+Формирование Google-отчёта по закрытым проектам.
+
+Отчёт строится либо в запросе (`POST /google/`), либо фоновым заданием
+(`POST /google/jobs`); одновременные запросы заданий объединяются в
+одно.
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from aiogoogle import Aiogoogle
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.constants import COLUMNS_LIMIT, ROWS_LIMIT, TABLE_VALUES
+from app.core.google_client import get_service
+from app.crud.charity_project import charity_project_crud
+from app.services.google_api import (format_data_report, format_time,
+                                     set_user_permissions,
+                                     spreadsheets_create,
+                                     spreadsheets_write_chunks)
+from app.services.google_discovery import DRIVE, SHEETS, discovery_cache
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class Timer:
+    """Длительности этапов в секундах."""
+
+    def __init__(self, timings: dict):
+        self.timings = timings
+
+    @asynccontextmanager
+    async def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(time.perf_counter() - started, 6)
+
+
+def report_item(project) -> dict:
+    return dict(
+        name=project.name,
+        time=format_time(project.time),
+        description=project.description,
+    )
+
+
+async def build_report(
+    session: AsyncSession,
+    wrapper_services: Aiogoogle,
+    timings: Optional[dict] = None,
+) -> str:
+    """
+    Создать таблицу отчёта и вернуть ссылку на неё.
+
+    Размер сетки берётся из COUNT закрытых проектов, строки читаются
+    из базы потоком порциями по `ROWS_LIMIT`. Первая порция уходит
+    вместе с созданием таблицы, остальные дописываются не более чем
+    `report_max_writes` запросами одновременно с выдачей прав.
+    Длительности этапов записываются в `timings`.
+    """
+    timer = Timer({} if timings is None else timings)
+    async with timer.stage('query'):
+        count = await charity_project_crud.count_closed(session)
+        chunks = aiter(
+            charity_project_crud.iter_projects_by_completion_rate(
+                session, count, ROWS_LIMIT
+            )
+        )
+        first = await anext(chunks, [])
+    table_body = await format_data_report(map(report_item, first))
+    async with timer.stage('discovery'):
+        sheets = await discovery_cache.get(wrapper_services, *SHEETS)
+        drive = await discovery_cache.get(wrapper_services, *DRIVE)
+    async with timer.stage('create'):
+        spreadsheet_id, spreadsheet_url = await spreadsheets_create(
+            wrapper_services,
+            service=sheets,
+            table_values=table_body,
+            grid_size=(len(TABLE_VALUES) + count, COLUMNS_LIMIT),
+        )
+
+    async def grant():
+        async with timer.stage('permissions'):
+            await set_user_permissions(
+                spreadsheet_id, wrapper_services, service=drive
+            )
+
+    async def rows():
+        async for chunk in chunks:
+            yield [list(report_item(project).values()) for project in chunk]
+
+    async with timer.stage('write'):
+        await asyncio.gather(
+            grant(),
+            spreadsheets_write_chunks(
+                wrapper_services,
+                spreadsheet_id,
+                rows(),
+                start_row=len(table_body) + 1,
+                service=sheets,
+                max_in_flight=settings.report_max_writes,
+            ),
+        )
+    return spreadsheet_url
+
+
+@dataclass
+class ReportJob:
+    id: str
+    status: str = PENDING
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    timings: dict = field(default_factory=dict)
+    url: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in (PENDING, RUNNING)
+
+
+class ReportJobs:
+    """
+    Фоновые задания отчёта.
+
+    Пока задание не завершено, новые запросы получают его же. История
+    последних `history_size` заданий хранится в памяти.
+    """
+
+    def __init__(
+        self,
+        history_size: int = 100,
+        service_factory: Callable = asynccontextmanager(get_service),
+    ):
+        self.history_size = history_size
+        self.service_factory = service_factory
+        self.jobs: OrderedDict[str, ReportJob] = OrderedDict()
+        self.current: Optional[ReportJob] = None
+        self.tasks: set[asyncio.Task] = set()
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        return self.jobs.get(job_id)
+
+    def submit(self, session_factory: async_sessionmaker) -> ReportJob:
+        """Запустить задание или вернуть уже выполняющееся."""
+        if self.current is not None and self.current.active:
+            return self.current
+        job = ReportJob(id=uuid.uuid4().hex)
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.history_size:
+            self.jobs.popitem(last=False)
+        self.current = job
+        task = asyncio.create_task(self._run(job, session_factory))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return job
+
+    async def _run(
+        self,
+        job: ReportJob,
+        session_factory: async_sessionmaker,
+    ) -> None:
+        job.status = RUNNING
+        job.started_at = datetime.now()
+        started = time.perf_counter()
+        try:
+            async with session_factory() as session, \
+                    self.service_factory() as wrapper_services:
+                job.url = await build_report(
+                    session, wrapper_services, job.timings
+                )
+            job.status = DONE
+        except Exception as error:
+            job.status = FAILED
+            job.error = f'{type(error).__name__}: {error}'
+        finally:
+            if job.status == RUNNING:
+                # Задание отменено при остановке приложения.
+                job.status = FAILED
+                job.error = 'Задание прервано.'
+            job.timings['total'] = round(time.perf_counter() - started, 6)
+            job.finished_at = datetime.now()
+
+    async def stop(self) -> None:
+        """Прервать выполняющиеся задания."""
+        for task in list(self.tasks):
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+
+report_jobs = ReportJobs()
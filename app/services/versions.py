@@ -0,0 +1,52 @@
+import time
+from collections.abc import Callable, Hashable
+from datetime import datetime, timezone
+
+PROJECTS = 'charity_project'
+DONATIONS = 'donation'
+
+
+def user_donations(user_id: int) -> tuple:
+    """Ключ версии пожертвований одного пользователя."""
+    return DONATIONS, user_id
+
+
+class DataVersions:
+    """
+    Возрастающие версии данных в памяти процесса.
+
+    Каждый путь записи после фиксации повышает версии изменённых
+    таблиц (`bump`). Версия и время её изменения дают ETag и
+    Last-Modified ответов. Метка запуска в ETag не даёт совпасть
+    версиям до и после перезапуска.
+    """
+
+    def __init__(self):
+        self.started = time.time_ns()
+        self.started_at = datetime.now(timezone.utc)
+        self.versions: dict[Hashable, tuple[int, datetime]] = {}
+        self.listeners: dict[Hashable, list[Callable[[], None]]] = {}
+
+    def get(self, key: Hashable) -> tuple[int, datetime]:
+        return self.versions.get(key, (0, self.started_at))
+
+    def bump(self, *keys: Hashable) -> None:
+        now = datetime.now(timezone.utc)
+        for key in keys:
+            version, _ = self.get(key)
+            self.versions[key] = (version + 1, now)
+            for listener in self.listeners.get(key, ()):
+                listener()
+
+    def subscribe(self, key: Hashable, listener: Callable[[], None]) -> None:
+        """Вызывать `listener` при каждом изменении версии `key`."""
+        self.listeners.setdefault(key, []).append(listener)
+
+    def etag(self, key: Hashable) -> str:
+        version, _ = self.get(key)
+        if isinstance(key, tuple):
+            key = '-'.join(map(str, key))
+        return f'W/"{self.started:x}-{key}-{version}"'
+
+
+data_versions = DataVersions()
@@ -0,0 +1,183 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.config import settings
+
+Job = Callable[[AsyncSession], Awaitable]
+
+
+class AllocationWriter:
+    """
+    Единственный писатель распределения средств в процессе.
+
+    Запросы на создание пожертвований и проектов ставятся в очередь и
+    применяются окнами: все задания окна выполняются в одной сессии и
+    фиксируются одним коммитом, после чего каждый вызывающий получает
+    свой результат.
+    """
+
+    def __init__(self):
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.batch: list = []
+        self.session_factory: Optional[async_sessionmaker] = None
+        self.window = 0.0
+        self.max_batch = 1
+        self.commits = 0
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    async def start(
+        self,
+        session_factory: async_sessionmaker,
+        window: float,
+        max_batch: int,
+    ) -> None:
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Остановить писателя.
+
+        Задания текущего окна и оставшиеся в очереди завершаются ошибкой,
+        чтобы ожидающие их запросы не зависали.
+        """
+        if not self.running:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+        pending, self.batch = self.batch, []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(
+                    RuntimeError('Писатель распределения остановлен.')
+                )
+
+    def enqueue(self, job: Job) -> asyncio.Future:
+        """Поставить задание в очередь, не дожидаясь его выполнения."""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((job, future))
+        return future
+
+    async def submit(self, job: Job):
+        return await self.enqueue(job)
+
+    async def execute(
+        self,
+        job: Job,
+        session: AsyncSession,
+        reload: Iterable = (),
+    ):
+        """
+        Выполнить задание через писателя, а если он не запущен —
+        сразу в сессии запроса.
+
+        При конфликте версий задание повторяется не более
+        `allocation_max_retries` раз; объекты `reload` после отката
+        перечитываются из базы.
+        """
+        if self.running:
+            return await self.submit(job)
+        attempts = settings.allocation_max_retries
+        while True:
+            try:
+                result = await job(session)
+                await session.commit()
+                return result
+            except StaleDataError:
+                await session.rollback()
+                if not attempts:
+                    raise
+                attempts -= 1
+                for obj in reload:
+                    await session.refresh(obj)
+
+    async def _collect(self) -> list:
+        self.batch = batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(
+                    await asyncio.wait_for(self.queue.get(), timeout)
+                )
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                await self._apply(batch)
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+
+    async def _attempt(self, session: AsyncSession, batch: list):
+        """Выполнить задания окна до первой ошибки и зафиксировать их."""
+        results = []
+        for job, future in batch:
+            try:
+                results.append((future, await job(session)))
+            except StaleDataError:
+                raise
+            except Exception as error:
+                return results, (job, future, error)
+        await session.commit()
+        return results, None
+
+    async def _apply(self, batch: list) -> None:
+        """
+        Применить окно одной транзакцией.
+
+        Если задание завершилось ошибкой, окно откатывается, ошибка
+        передаётся его автору, а остальные задания применяются заново.
+        При конфликте версий окно повторяется целиком.
+        """
+        batch = [item for item in batch if not item[1].cancelled()]
+        attempts = settings.allocation_max_retries
+        while batch:
+            async with self.session_factory() as session:
+                try:
+                    results, failed = await self._attempt(session, batch)
+                except StaleDataError:
+                    await session.rollback()
+                    if not attempts:
+                        raise
+                    attempts -= 1
+                    continue
+                if failed is not None:
+                    await session.rollback()
+                    job, future, error = failed
+                    if not future.done():
+                        future.set_exception(error)
+                    batch = [item for item in batch if item[0] is not job]
+                    continue
+            self.commits += 1
+            for future, result in results:
+                if not future.done():
+                    future.set_result(result)
+            return
+
+
+allocation_writer = AllocationWriter()
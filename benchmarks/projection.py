@@ -0,0 +1,129 @@
+"""
+Сравнение путей чтения списков: сущности ORM и проекция столбцов.
+
+Для каждого размера база заполняется набором `open_donations`, после
+чего список пожертвований читается через `get_multi` и через
+`get_multi_rows`, а результат проверяется схемой ответа и
+сериализуется в JSON, как это делает FastAPI. Отчёт содержит время и
+пиковую память на строку для обоих путей.
+
+    python -m benchmarks.projection --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.crud.donation import donation_crud
+from app.schemas.donation import DonationFullInfoDB
+from benchmarks.run import stats
+from benchmarks.seed import OPEN_DONATIONS, seed
+
+FIELDS = list(DonationFullInfoDB.model_fields)
+RESPONSE = TypeAdapter(list[DonationFullInfoDB])
+
+
+async def read_entities(session) -> bytes:
+    return RESPONSE.dump_json(
+        RESPONSE.validate_python(await donation_crud.get_multi(session))
+    )
+
+
+async def read_rows(session) -> bytes:
+    return RESPONSE.dump_json(
+        RESPONSE.validate_python(
+            await donation_crud.get_multi_rows(session, FIELDS)
+        )
+    )
+
+
+PATHS = {'get_multi': read_entities, 'get_multi_rows': read_rows}
+
+
+async def measure_path(session_factory, read, repeats: int) -> dict:
+    samples = []
+    for _ in range(repeats):
+        async with session_factory() as session:
+            started = time.perf_counter()
+            await read(session)
+            samples.append(time.perf_counter() - started)
+    async with session_factory() as session:
+        tracemalloc.start()
+        try:
+            body = await read(session)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return stats(samples) | dict(peak_memory_bytes=peak, body=body)
+
+
+async def run(
+    sizes,
+    repeats: int = 5,
+    directory: Optional[str] = None,
+) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory(dir=directory) as workdir:
+        for size in sizes:
+            engine = create_async_engine(
+                f'sqlite+aiosqlite:///{workdir}/projection-{size}.db'
+            )
+            session_factory = async_sessionmaker(
+                engine, expire_on_commit=False
+            )
+            try:
+                await seed(engine, OPEN_DONATIONS, size)
+                measured = {
+                    name: await measure_path(session_factory, read, repeats)
+                    for name, read in PATHS.items()
+                }
+            finally:
+                await engine.dispose()
+            bodies = {result.pop('body') for result in measured.values()}
+            if len(bodies) != 1:
+                raise RuntimeError(
+                    f'{size}: пути чтения вернули разные ответы.'
+                )
+            rows = len(json.loads(bodies.pop()))
+            for name, result in measured.items():
+                result['rows'] = rows
+                result['us_per_row'] = round(
+                    result['median_ms'] * 1000 / rows, 3
+                )
+                result['bytes_per_row'] = result['peak_memory_bytes'] // rows
+                results[f'{size}/{name}'] = result
+            print(f'{size}: готово', file=sys.stderr)
+    return results
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.projection',
+        description='Сравнение чтения списков через ORM и проекцию.',
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1000, 10000, 100000]
+    )
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument(
+        '--directory', help='каталог для временных баз SQLite'
+    )
+    return parser.parse_args(argv)
+
+
+async def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = await run(args.sizes, args.repeats, args.directory)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
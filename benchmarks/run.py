@@ -0,0 +1,232 @@
+"""
+Бенчмарки горячих путей распределения и CRUD.
+
+Для каждого набора данных и размера база заполняется синтетическими
+строками, после чего запросы выполняются через ASGI-приложение
+(`httpx.ASGITransport`), а запрос отчёта — напрямую через CRUD.
+
+    python -m benchmarks.run --sizes 1000 10000 --save-baseline
+    python -m benchmarks.run --sizes 1000 10000 --threshold 0.25
+
+Без `--save-baseline` результаты сравниваются с базовыми
+(`benchmarks/baseline.json`); если медиана замера выросла больше чем
+на `threshold`, команда завершается с кодом 1.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.db import get_async_session
+from app.core.user import current_superuser, current_user
+from app.crud.charity_project import charity_project_crud
+from app.main import app
+from app.models import User
+from benchmarks.seed import SCENARIOS, seed
+
+BASELINE = Path(__file__).with_name('baseline.json')
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+bench_user = User(
+    id=1, email='bench@example.com', hashed_password='',
+    is_active=True, is_verified=True, is_superuser=True,
+)
+
+
+def stats(samples: list[float]) -> dict:
+    samples = sorted(sample * 1000 for sample in samples)
+    return dict(
+        runs=len(samples),
+        median_ms=round(statistics.median(samples), 4),
+        p95_ms=round(samples[max(0, -(-95 * len(samples) // 100) - 1)], 4),
+        min_ms=round(samples[0], 4),
+    )
+
+
+async def measure(operation, repeats: int) -> dict:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await operation()
+        samples.append(time.perf_counter() - started)
+    return stats(samples)
+
+
+def checked(response):
+    if response.status_code != 200:
+        raise RuntimeError(
+            f'{response.request.method} {response.request.url}: '
+            f'{response.status_code} {response.text}'
+        )
+    return response
+
+
+async def run_case(
+    client: AsyncClient,
+    session_factory,
+    repeats: int,
+    list_repeats: int,
+) -> dict:
+    names = (f'Бенчмарк-проект {number}' for number in itertools.count())
+
+    async def post_donation():
+        checked(await client.post('/donation/', json={'full_amount': 1000}))
+
+    async def post_project():
+        checked(await client.post('/charity_project/', json={
+            'name': next(names),
+            'description': 'Проект, созданный бенчмарком',
+            'full_amount': 20000,
+        }))
+
+    async def list_donations():
+        checked(await client.get('/donation/'))
+
+    async def list_projects():
+        checked(await client.get('/charity_project/'))
+
+    async def report():
+        async with session_factory() as session:
+            await charity_project_crud.get_projects_by_completion_rate(
+                session
+            )
+
+    return {
+        'post_donation': await measure(post_donation, repeats),
+        'post_charity_project': await measure(post_project, repeats),
+        'get_donations': await measure(list_donations, list_repeats),
+        'get_charity_projects': await measure(list_projects, list_repeats),
+        'report_query': await measure(report, list_repeats),
+    }
+
+
+async def run(
+    sizes,
+    scenarios=SCENARIOS,
+    repeats: int = 20,
+    list_repeats: int = 3,
+    directory: Optional[str] = None,
+) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory(dir=directory) as workdir:
+        for scenario, size in itertools.product(scenarios, sizes):
+            engine = create_async_engine(
+                f'sqlite+aiosqlite:///{workdir}/{scenario}-{size}.db'
+            )
+            session_factory = async_sessionmaker(
+                engine, expire_on_commit=False
+            )
+
+            async def override_session():
+                async with session_factory() as session:
+                    yield session
+
+            await seed(engine, scenario, size)
+            overrides = {
+                get_async_session: override_session,
+                current_user: lambda: bench_user,
+                current_superuser: lambda: bench_user,
+            }
+            saved = dict(app.dependency_overrides)
+            app.dependency_overrides.update(overrides)
+            try:
+                async with AsyncClient(
+                    transport=ASGITransport(app=app),
+                    base_url='http://bench',
+                ) as client:
+                    case = await run_case(
+                        client, session_factory, repeats, list_repeats
+                    )
+            finally:
+                app.dependency_overrides.clear()
+                app.dependency_overrides.update(saved)
+                await engine.dispose()
+            for name, result in case.items():
+                results[f'{scenario}/{size}/{name}'] = result
+            print(f'{scenario}/{size}: готово', file=sys.stderr)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Замеры, медиана которых выросла больше чем на `threshold`."""
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        limit = baseline[key]['median_ms'] * (1 + threshold)
+        if result['median_ms'] > limit:
+            regressions.append(
+                f'{key}: {result["median_ms"]} мс > '
+                f'{baseline[key]["median_ms"]} мс + {threshold:.0%}'
+            )
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.run',
+        description='Бенчмарки распределения средств и CRUD.',
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+        help='размеры открытой очереди, от 10^3 до 10^6',
+    )
+    parser.add_argument(
+        '--scenario', action='append', choices=SCENARIOS,
+        help='набор данных, по умолчанию все',
+    )
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--list-repeats', type=int, default=3)
+    parser.add_argument('--engine', default=settings.investment_engine)
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    parser.add_argument('--output', type=Path)
+    parser.add_argument(
+        '--directory', help='каталог для временных баз SQLite'
+    )
+    return parser.parse_args(argv)
+
+
+async def main(argv=None) -> int:
+    args = parse_args(argv)
+    settings.investment_engine = args.engine
+    results = await run(
+        args.sizes,
+        args.scenario or SCENARIOS,
+        args.repeats,
+        args.list_repeats,
+        args.directory,
+    )
+    report = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(report + '\n', encoding='utf-8')
+    print(report)
+    if args.save_baseline:
+        args.baseline.write_text(report + '\n', encoding='utf-8')
+        return 0
+    if not args.baseline.exists():
+        print(f'Нет базовых результатов: {args.baseline}', file=sys.stderr)
+        return 0
+    regressions = compare(
+        results,
+        json.loads(args.baseline.read_text(encoding='utf-8')),
+        args.threshold,
+    )
+    for line in regressions:
+        print(f'Регрессия: {line}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,105 @@
+"""Синтетические наборы данных для бенчмарков."""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.db import Base
+from app.models import CharityProject, Donation
+
+BATCH_SIZE = 10000
+START = datetime(2025, 1, 1)
+
+OPEN_DONATIONS = 'open_donations'
+OPEN_PROJECTS = 'open_projects'
+SCENARIOS = (OPEN_DONATIONS, OPEN_PROJECTS)
+
+
+def donation_rows(count, rnd, first_id=1, closed=False):
+    for number in range(count):
+        amount = rnd.randint(1, 5000)
+        create_date = START + timedelta(seconds=number)
+        yield dict(
+            id=first_id + number,
+            full_amount=amount,
+            invested_amount=amount if closed else 0,
+            fully_invested=closed,
+            create_date=create_date,
+            close_date=create_date + timedelta(hours=1) if closed else None,
+            version=1,
+        )
+
+
+def project_rows(count, rnd, first_id=1, closed=False):
+    for number in range(count):
+        amount = rnd.randint(10000, 1000000)
+        create_date = START + timedelta(seconds=number)
+        yield dict(
+            id=first_id + number,
+            name=f'Проект {first_id + number}',
+            description='Синтетический проект для бенчмарка',
+            full_amount=amount,
+            invested_amount=amount if closed else 0,
+            fully_invested=closed,
+            create_date=create_date,
+            close_date=(
+                create_date + timedelta(hours=rnd.randint(1, 1000))
+                if closed else None
+            ),
+            version=1,
+        )
+
+
+async def insert_rows(engine: AsyncEngine, model, rows) -> None:
+    batch = []
+    async with engine.begin() as connection:
+        for row in rows:
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                await connection.execute(insert(model.__table__), batch)
+                batch = []
+        if batch:
+            await connection.execute(insert(model.__table__), batch)
+
+
+async def seed(
+    engine: AsyncEngine,
+    scenario: str,
+    size: int,
+    seed: int = 0,
+) -> None:
+    """
+    Заполнить пустую базу набором `scenario` из `size` открытых объектов.
+
+    `open_donations` — очередь открытых пожертвований и нет открытых
+    проектов, `open_projects` — наоборот. В обоих наборах есть
+    закрытые проекты и пожертвования (десятая часть от `size`) для
+    списков и отчёта.
+    """
+    rnd = random.Random(seed)
+    closed = max(1, size // 10)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    if scenario == OPEN_DONATIONS:
+        await insert_rows(
+            engine, CharityProject, project_rows(closed, rnd, closed=True)
+        )
+        await insert_rows(engine, Donation, donation_rows(size, rnd))
+    elif scenario == OPEN_PROJECTS:
+        await insert_rows(
+            engine, Donation, donation_rows(closed, rnd, closed=True)
+        )
+        await insert_rows(
+            engine,
+            CharityProject,
+            project_rows(closed, rnd, closed=True),
+        )
+        await insert_rows(
+            engine,
+            CharityProject,
+            project_rows(size, rnd, first_id=closed + 1),
+        )
+    else:
+        raise ValueError(f'Неизвестный набор данных: {scenario}')
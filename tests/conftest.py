@@ -51,6 +51,8 @@ except (NameError, ImportError) as error:
     )
 
 
+from app.services.cache import project_cache  # noqa
+
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
 
 pytest_plugins = [
@@ -109,6 +111,7 @@ def charity_project_model():
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    project_cache.invalidate()
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -0,0 +1,157 @@
+import pytest
+from conftest import app, current_user
+from fixtures.user import superuser
+from sqlalchemy import event, select
+from test_investment_engines import Record, make_events, replay
+
+from app.core.config import settings
+from app.models import Allocation
+from app.services.allocation import ENGINES
+from app.services.investment import invest_funds
+from app.services.ledger import open_pool_ledger
+
+PROJECTS_BULK_URL = '/charity_project/bulk'
+PROJECT_ALLOCATIONS_URL = '/charity_project/{project_id}/allocations'
+DONATION_ALLOCATION_URL = '/donation/{donation_id}/allocation'
+
+
+@pytest.fixture
+def client(superuser_client, monkeypatch):
+    monkeypatch.setitem(
+        app.dependency_overrides, current_user, lambda: superuser
+    )
+    return superuser_client
+
+
+def simulate_transfers(events):
+    projects, donations, transfers = [], [], []
+    for kind, amount in events:
+        target = Record(amount)
+        if kind == 'project':
+            projects.append(target)
+            target.id = len(projects)
+            sources = [d for d in donations if not d.fully_invested]
+        else:
+            donations.append(target)
+            target.id = len(donations)
+            sources = [p for p in projects if not p.fully_invested]
+        moved = []
+        invest_funds(target, sources, moved)
+        for target, source, amount in moved:
+            if kind == 'project':
+                transfers.append((source.id, target.id, amount))
+            else:
+                transfers.append((target.id, source.id, amount))
+    return transfers
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+@pytest.mark.parametrize('seed', (1, 2))
+async def test_engines_record_transfers(session, monkeypatch, engine, seed):
+    monkeypatch.setattr(settings, 'investment_engine', engine)
+    if engine == 'ledger':
+        monkeypatch.setattr(open_pool_ledger, 'ready', False)
+        await open_pool_ledger.build(session)
+    events = make_events(seed)
+    await replay(session, events)
+    allocations = (
+        await session.execute(select(Allocation).order_by(Allocation.id))
+    ).scalars().all()
+    assert [
+        (allocation.donation_id, allocation.project_id, allocation.amount)
+        for allocation in allocations
+    ] == simulate_transfers(events), (
+        f'Механизм инвестирования `{engine}` должен записывать в журнал '
+        'распределения те же переводы, что выполняет `invest_funds`.'
+    )
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+async def test_transfers_written_in_one_insert(
+    client, session, monkeypatch, engine
+):
+    monkeypatch.setattr(settings, 'investment_engine', engine)
+    monkeypatch.setattr(settings, 'investment_chunk_size', 2)
+    if engine == 'ledger':
+        monkeypatch.setattr(open_pool_ledger, 'ready', False)
+        await open_pool_ledger.build(session)
+    client.post(PROJECTS_BULK_URL, json=[
+        {
+            'name': f'Проект {number}',
+            'description': 'Описание проекта',
+            'full_amount': 100,
+        }
+        for number in range(5)
+    ])
+    if engine == 'ledger':
+        await open_pool_ledger.build(session)
+
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, *args):
+        if statement.startswith('INSERT INTO allocation'):
+            inserts.append(statement)
+
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, 'before_cursor_execute', count_inserts)
+    try:
+        response = client.post(
+            '/donation/', json={'full_amount': 450}
+        )
+    finally:
+        event.remove(sync_engine, 'before_cursor_execute', count_inserts)
+    donation_id = response.json()['id']
+
+    assert len(inserts) == 1, (
+        'Переводы одного распределения должны записываться одним INSERT.'
+    )
+    response = client.get(
+        DONATION_ALLOCATION_URL.format(donation_id=donation_id)
+    )
+    assert [
+        (allocation['project_id'], allocation['amount'])
+        for allocation in response.json()['allocations']
+    ] == [(1, 100), (2, 100), (3, 100), (4, 100), (5, 50)]
+
+
+def test_project_allocations(client):
+    for amount in (300, 400):
+        client.post('/donation/', json={'full_amount': amount})
+    client.post(PROJECTS_BULK_URL, json=[
+        {
+            'name': f'{name} проект',
+            'description': 'Описание проекта',
+            'full_amount': 500,
+        }
+        for name in ('Первый', 'Второй')
+    ])
+    response = client.get(
+        PROJECT_ALLOCATIONS_URL.format(project_id=1)
+    )
+    assert response.status_code == 200
+    assert [
+        (allocation['donation_id'], allocation['amount'])
+        for allocation in response.json()
+    ] == [(1, 300), (2, 200)], (
+        'Журнал распределения должен показывать, из каких пожертвований '
+        'финансировался проект.'
+    )
+    response = client.get(
+        PROJECT_ALLOCATIONS_URL.format(project_id=2)
+    )
+    assert [
+        (allocation['donation_id'], allocation['amount'])
+        for allocation in response.json()
+    ] == [(2, 200)]
+
+
+def test_project_allocations_not_found(client):
+    response = client.get(
+        PROJECT_ALLOCATIONS_URL.format(project_id=100)
+    )
+    assert response.status_code == 404
+
+
+def test_project_allocations_superuser_only(user_client):
+    response = user_client.get(PROJECT_ALLOCATIONS_URL.format(project_id=1))
+    assert response.status_code == 403
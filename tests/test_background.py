@@ -0,0 +1,132 @@
+import pytest
+import pytest_asyncio
+from conftest import AsyncTestingSessionLocal
+
+from app.core.config import settings
+from app.crud.allocation import allocation_crud
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.schemas.charity_project import CharityProjectCreate
+from app.schemas.donation import DonationCreate
+from app.services.background import (ALLOCATED, PENDING, BackgroundAllocator,
+                                     background_allocator)
+from app.services.writer import AllocationWriter
+
+from fixtures.user import superuser, user
+
+ALLOCATION_URL = '/donation/{donation_id}/allocation'
+
+
+@pytest_asyncio.fixture
+async def allocator(monkeypatch):
+    monkeypatch.setattr(settings, 'investment_mode', 'background')
+    writer = AllocationWriter()
+    await writer.start(AsyncTestingSessionLocal, window=0.01, max_batch=10)
+    yield BackgroundAllocator(writer)
+    await writer.stop()
+
+
+async def create_project(session, name, amount):
+    project = await charity_project_crud.create(
+        session,
+        CharityProjectCreate(
+            name=name, description='Описание проекта', full_amount=amount
+        ),
+    )
+    await session.commit()
+    return project
+
+
+async def create_donation(session, amount, owner=None):
+    donation = await donation_crud.create(
+        session, DonationCreate(full_amount=amount), owner
+    )
+    await session.commit()
+    return donation
+
+
+async def test_background_allocation(allocator, session):
+    assert allocator.enabled
+    first = await create_project(session, 'Первый проект', 300)
+    second = await create_project(session, 'Второй проект', 1000)
+    donation = await create_donation(session, 500)
+
+    pending = allocator.enqueue(donation.id)
+    assert allocator.state(donation.id) == PENDING, (
+        'До выполнения задания пожертвование должно ожидать распределения.'
+    )
+    await pending
+    assert allocator.state(donation.id) == ALLOCATED
+    async with AsyncTestingSessionLocal() as check:
+        donation = await donation_crud.get(check, donation.id)
+        allocations = await allocation_crud.get_by_donation(
+            check, donation.id
+        )
+    assert donation.invested_amount == 500 and donation.fully_invested
+    assert [
+        (allocation.project_id, allocation.amount)
+        for allocation in allocations
+    ] == [(first.id, 300), (second.id, 200)], (
+        'Фоновое распределение должно записывать переводы в журнал.'
+    )
+
+
+async def test_background_recover(allocator, session):
+    for amount in (100, 200):
+        await create_donation(session, amount)
+    assert await allocator.recover(session) == 0, (
+        'Без открытых проектов восстанавливать распределение не нужно.'
+    )
+    await create_project(session, 'Проект', 1000)
+    assert await allocator.recover(session) == 2
+    await allocator.writer.submit(lambda session: session.flush())
+    async with AsyncTestingSessionLocal() as check:
+        donations = await donation_crud.get_multi(check)
+    assert all(donation.fully_invested for donation in donations), (
+        'Пожертвования, не распределённые до остановки, должны '
+        'распределяться после запуска.'
+    )
+
+
+def test_allocation_status_sync(user_client):
+    response = user_client.post('/donation/', json={'full_amount': 100})
+    donation_id = response.json()['id']
+    response = user_client.get(ALLOCATION_URL.format(donation_id=donation_id))
+    assert response.status_code == 200
+    assert response.json() == {
+        'id': donation_id,
+        'status': 'allocated',
+        'full_amount': 100,
+        'invested_amount': 0,
+        'fully_invested': False,
+        'allocations': [],
+    }, (
+        'Синхронно созданное пожертвование должно считаться распределённым.'
+    )
+
+
+async def test_allocation_status_pending(user_client, session, monkeypatch):
+    donation = await create_donation(session, 100, user)
+    monkeypatch.setitem(background_allocator.states, donation.id, PENDING)
+    response = user_client.get(ALLOCATION_URL.format(donation_id=donation.id))
+    assert response.json()['status'] == 'pending'
+
+
+@pytest.mark.parametrize('owner, status_code', (
+    (superuser, 403),
+    (user, 200),
+))
+async def test_allocation_status_access(
+    user_client, session, owner, status_code
+):
+    donation = await create_donation(session, 100, owner)
+    response = user_client.get(ALLOCATION_URL.format(donation_id=donation.id))
+    assert response.status_code == status_code, (
+        'Состояние распределения доступно только автору пожертвования и '
+        'суперпользователям.'
+    )
+
+
+def test_allocation_status_not_found(user_client):
+    response = user_client.get(ALLOCATION_URL.format(donation_id=100))
+    assert response.status_code == 404
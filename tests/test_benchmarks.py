@@ -0,0 +1,45 @@
+from sqlalchemy import func, select
+
+from app.models import CharityProject, Donation
+from benchmarks import projection
+from benchmarks.run import compare
+from benchmarks.seed import OPEN_DONATIONS, OPEN_PROJECTS, seed
+
+
+def test_compare_reports_regressions():
+    baseline = {
+        'a': {'median_ms': 10.0},
+        'b': {'median_ms': 10.0},
+    }
+    results = {
+        'a': {'median_ms': 12.0},
+        'b': {'median_ms': 13.0},
+        'c': {'median_ms': 100.0},
+    }
+    regressions = compare(results, baseline, threshold=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith('b:'), (
+        'Регрессией считается только рост медианы сверх порога; замеры без '
+        'базовых значений не сравниваются.'
+    )
+
+
+async def count_open(session, model):
+    return await session.scalar(
+        select(func.count()).select_from(model).where(model.is_open())
+    )
+
+
+async def test_seed_scenarios(session):
+    engine = session.bind
+    await seed(engine, OPEN_DONATIONS, 50)
+    assert await count_open(session, Donation) == 50
+    assert await count_open(session, CharityProject) == 0
+    await seed(engine, OPEN_PROJECTS, 50)
+    assert await count_open(session, CharityProject) == 50
+    assert await count_open(session, Donation) == 0
+
+
+async def test_projection_benchmark(tmp_path):
+    results = await projection.run([20], repeats=1, directory=tmp_path)
+    assert set(results) == {'20/get_multi', '20/get_multi_rows'}
+    assert all(result['rows'] == 20 for result in results.values())
@@ -0,0 +1,184 @@
+import random
+
+import pytest
+from sqlalchemy import select
+
+from app.crud.charity_project import charity_project_crud
+from app.models import CharityProject
+from app.schemas.charity_project import CharityProjectCreate
+from app.services.investment import invest_batch, invest_funds
+
+DONATIONS_BULK_URL = '/donation/bulk'
+PROJECTS_BULK_URL = '/charity_project/bulk'
+
+
+class Record:
+    def __init__(self, full_amount, invested_amount=0):
+        self.full_amount = full_amount
+        self.invested_amount = invested_amount
+        self.fully_invested = False
+        self.close_date = None
+
+    @property
+    def remaining(self):
+        return self.full_amount - self.invested_amount
+
+
+def make_records(rnd, count):
+    return [Record(rnd.randint(1, 300)) for _ in range(count)]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_invest_batch_matches_invest_funds(seed):
+    rnd = random.Random(seed)
+    targets, sources = make_records(rnd, 30), make_records(rnd, 30)
+    rnd = random.Random(seed)
+    expected_targets = make_records(rnd, 30)
+    expected_sources = make_records(rnd, 30)
+
+    invest_batch(targets, sources)
+    for target in expected_targets:
+        invest_funds(
+            target, [s for s in expected_sources if not s.fully_invested]
+        )
+
+    def state(records):
+        return [(r.invested_amount, r.fully_invested) for r in records]
+
+    assert state(targets) == state(expected_targets), (
+        '`invest_batch` должна распределять пачку так же, как '
+        'последовательные вызовы `invest_funds`.'
+    )
+    assert state(sources) == state(expected_sources)
+
+
+async def test_create_donations_bulk(
+        user_client, charity_project_little_invested, session
+):
+    project = charity_project_little_invested
+    first = project.remaining - 100
+    response = user_client.post(
+        DONATIONS_BULK_URL,
+        json=[
+            {'full_amount': first, 'comment': 'Первый'},
+            {'full_amount': 300},
+        ],
+    )
+    assert response.status_code == 200, (
+        f'POST-запрос к `{DONATIONS_BULK_URL}` должен возвращать '
+        'статус-код 200.'
+    )
+    data = response.json()
+    items = data['items']
+    assert [item['full_amount'] for item in items] == [first, 300]
+    assert items[0]['id'] < items[1]['id']
+    assert items[0]['fully_invested'] and items[0]['comment'] == 'Первый'
+    assert items[1]['invested_amount'] == 100
+    assert not items[1]['fully_invested']
+    assert data['summary'] == {
+        'items': 2,
+        'full_amount': first + 300,
+        'invested_amount': first + 100,
+        'unallocated_amount': 200,
+        'closed_items': 1,
+        'touched_counterparts': 1,
+        'closed_counterparts': 1,
+    }
+    project = (
+        await session.execute(
+            select(CharityProject).where(CharityProject.id == project.id)
+        )
+    ).scalars().first()
+    assert project.fully_invested, (
+        'Пачка пожертвований должна закрыть проект, сумму которого покрывает.'
+    )
+
+
+def test_create_donations_bulk_invalid(user_client):
+    assert user_client.post(DONATIONS_BULK_URL, json=[]).status_code == 422
+    assert user_client.post(
+        DONATIONS_BULK_URL, json=[{'full_amount': 0}]
+    ).status_code == 422
+
+
+def bulk_projects(*amounts, prefix='Bulk project'):
+    return [
+        {
+            'name': f'{prefix} {number}',
+            'description': 'Описание проекта',
+            'full_amount': amount,
+        }
+        for number, amount in enumerate(amounts)
+    ]
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_create_projects_bulk(superuser_client):
+    response = superuser_client.post(
+        PROJECTS_BULK_URL, json=bulk_projects(50, 100, 5000)
+    )
+    assert response.status_code == 200, (
+        f'POST-запрос суперпользователя к `{PROJECTS_BULK_URL}` должен '
+        'возвращать статус-код 200.'
+    )
+    data = response.json()
+    assert [
+        (item['invested_amount'], item['fully_invested'])
+        for item in data['items']
+    ] == [(50, True), (100, True), (1950, False)], (
+        'Проекты пачки должны поглощать нераспределённые пожертвования '
+        'в порядке перечисления.'
+    )
+    assert data['summary']['invested_amount'] == 2100
+    assert data['summary']['closed_counterparts'] == 2
+    names = {
+        project['name']
+        for project in superuser_client.get('/charity_project/').json()
+    }
+    assert names == {item['name'] for item in data['items']}
+
+
+@pytest.mark.usefixtures('charity_project')
+@pytest.mark.parametrize('projects', (
+    bulk_projects(10, 20, prefix='Same name'),
+    [
+        {
+            'name': 'chimichangas4life',
+            'description': 'Описание проекта',
+            'full_amount': 10,
+        },
+    ],
+))
+def test_create_projects_bulk_name_not_unique(superuser_client, projects):
+    projects[-1]['name'] = projects[0]['name']
+    response = superuser_client.post(PROJECTS_BULK_URL, json=projects)
+    assert response.status_code == 400, (
+        'Если имена проектов пачки повторяются или уже заняты, должен '
+        'возвращаться статус-код 400.'
+    )
+    assert len(superuser_client.get('/charity_project/').json()) == 1
+
+
+def test_create_projects_bulk_usual_user(user_client):
+    response = user_client.post(PROJECTS_BULK_URL, json=bulk_projects(10))
+    assert response.status_code == 403
+
+
+async def test_create_multi_ids_follow_values_order(session):
+    crud = charity_project_crud
+    projects = crud.build_multi([
+        CharityProjectCreate(
+            name=f'Проект {index}',
+            description='Описание проекта',
+            full_amount=100 + index,
+        )
+        for index in range(5)
+    ])
+    await crud.create_multi(session, projects)
+    await session.commit()
+    rows = (await session.execute(
+        select(CharityProject.id, CharityProject.name)
+    )).all()
+    assert {project.id: project.name for project in projects} == dict(rows), (
+        '`id` из RETURNING должны присваиваться объектам в порядке вставки.'
+    )
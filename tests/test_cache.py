@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+from conftest import app
+from fixtures.user import superuser
+
+from app.core.constants import NEXT_CURSOR_HEADER
+from app.core.user import current_user
+from app.services.cache import ResponseCache, project_cache
+
+PROJECTS_URL = '/charity_project/'
+CACHE_URL = '/investment/cache'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def value(result):
+    return result
+
+
+async def test_lru_eviction_and_ttl():
+    clock = Clock()
+    cache = ResponseCache(max_size=2, ttl=10, clock=clock)
+    await cache.get_or_build('a', lambda: value(1))
+    await cache.get_or_build('b', lambda: value(2))
+    await cache.get_or_build('a', lambda: value(0))
+    await cache.get_or_build('c', lambda: value(3))
+    assert list(cache.entries) == ['a', 'c'], (
+        'Вытесняться должна запись, которую дольше всех не читали.'
+    )
+    clock.now = 10
+    assert await cache.get_or_build('a', lambda: value(4)) == 4, (
+        'Запись старше `ttl` должна строиться заново.'
+    )
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 4, 1)
+
+
+async def test_concurrent_misses_share_one_build():
+    cache = ResponseCache(max_size=10, ttl=60)
+    calls = 0
+
+    async def build():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b'[]'
+
+    results = await asyncio.gather(
+        *(cache.get_or_build('key', build) for _ in range(10))
+    )
+    assert results == [b'[]'] * 10
+    assert calls == 1, 'Одновременные промахи должны ждать одного построения.'
+    assert (cache.misses, cache.coalesced) == (1, 9)
+
+
+async def test_build_error_reaches_waiters():
+    cache = ResponseCache(max_size=10, ttl=60)
+
+    async def build():
+        await asyncio.sleep(0.01)
+        raise ValueError('ошибка')
+
+    results = await asyncio.gather(
+        *(cache.get_or_build('key', build) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not cache.entries and not cache.building
+
+
+async def test_cancelled_build_is_retried_by_waiter():
+    cache = ResponseCache(max_size=10, ttl=60)
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    builder = asyncio.create_task(cache.get_or_build('key', slow))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(
+        cache.get_or_build('key', lambda: value(b'ok'))
+    )
+    await asyncio.sleep(0)
+    builder.cancel()
+    assert await waiter == b'ok'
+
+
+async def test_invalidate_during_build_is_not_stored():
+    cache = ResponseCache(max_size=10, ttl=60)
+
+    async def build():
+        cache.invalidate()
+        return b'old'
+
+    assert await cache.get_or_build('key', build) == b'old'
+    assert not cache.entries, (
+        'Значение, построенное до сброса кэша, не должно сохраняться.'
+    )
+
+
+def test_project_list_is_served_from_cache(superuser_client, charity_project):
+    before = project_cache.stats()
+    first = superuser_client.get(PROJECTS_URL)
+    second = superuser_client.get(PROJECTS_URL)
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert first.json()[0]['name'] == 'chimichangas4life'
+    stats = superuser_client.get(CACHE_URL).json()
+    assert stats['size'] == 1
+    assert stats['hits'] - before['hits'] == 1, (
+        'Повторный запрос списка должен отдаваться из кэша.'
+    )
+    assert stats['misses'] - before['misses'] == 1
+
+
+def test_writes_invalidate_cache(
+    superuser_client, charity_project, monkeypatch,
+):
+    monkeypatch.setitem(app.dependency_overrides, current_user,
+                        lambda: superuser)
+    project_url = f'{PROJECTS_URL}{charity_project.id}'
+    invalidations = project_cache.invalidations
+    assert superuser_client.get(project_url).json()['invested_amount'] == 0
+    assert len(superuser_client.get(PROJECTS_URL).json()) == 1
+    response = superuser_client.post('/donation/', json={'full_amount': 300})
+    assert response.status_code == 200
+    assert superuser_client.get(project_url).json()['invested_amount'] == 300
+    superuser_client.post(PROJECTS_URL, json={
+        'name': 'Новый проект',
+        'description': 'Описание нового проекта',
+        'full_amount': 100,
+    })
+    assert len(superuser_client.get(PROJECTS_URL).json()) == 2
+    superuser_client.patch(project_url, json={'name': 'Новое название'})
+    assert superuser_client.get(project_url).json()['name'] == (
+        'Новое название'
+    )
+    assert project_cache.invalidations - invalidations == 3
+
+
+def test_cached_page_keeps_cursor(test_client, charity_project):
+    for _ in range(2):
+        response = test_client.get(PROJECTS_URL, params={'limit': 1})
+        assert NEXT_CURSOR_HEADER not in response.headers
+        assert len(response.json()) == 1
+
+
+def test_missing_project_not_cached(test_client):
+    assert test_client.get(f'{PROJECTS_URL}100').status_code == 404
+    assert not project_cache.entries
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_cache_stats_superuser_only(user_client):
+    assert user_client.get(CACHE_URL).status_code == 403
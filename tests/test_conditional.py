@@ -0,0 +1,111 @@
+import pytest
+
+from app.api.endpoints import charity_project, donation
+from app.services.cache import project_cache
+from app.services.versions import (DONATIONS, PROJECTS, DataVersions,
+                                   user_donations)
+
+PROJECTS_URL = '/charity_project/'
+DONATIONS_URL = '/donation/'
+MY_DONATIONS_URL = '/donation/my'
+
+
+@pytest.fixture
+def no_queries(monkeypatch):
+    """Запрос списков из базы завершает тест ошибкой."""
+    async def forbidden(*args, **kwargs):
+        raise AssertionError('Ответ 304 не должен читать данные из базы.')
+
+    project_cache.invalidate()
+    for module in (charity_project, donation):
+        monkeypatch.setattr(module.crud, 'get_multi_rows', forbidden)
+        monkeypatch.setattr(module.crud, 'get_page', forbidden)
+
+
+def test_versions_bump_and_etag():
+    versions = DataVersions()
+    initial = versions.etag(PROJECTS)
+    versions.bump(PROJECTS)
+    assert versions.get(PROJECTS)[0] == 1
+    assert versions.etag(PROJECTS) != initial
+    assert versions.get(DONATIONS)[0] == 0
+    assert versions.etag(user_donations(1)) != versions.etag(
+        user_donations(2)
+    ), 'ETag пожертвований разных пользователей не должен совпадать.'
+
+
+def test_versions_notify_listeners():
+    versions = DataVersions()
+    calls = []
+    versions.subscribe(PROJECTS, lambda: calls.append(PROJECTS))
+    versions.bump(PROJECTS, DONATIONS)
+    assert calls == [PROJECTS]
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_projects_not_modified(test_client, request):
+    response = test_client.get(PROJECTS_URL)
+    assert response.status_code == 200
+    etag = response.headers['etag']
+    assert response.headers['last-modified']
+    request.getfixturevalue('no_queries')
+    for if_none_match in (etag, etag.removeprefix('W/'), f'"x", {etag}', '*'):
+        cached = test_client.get(
+            PROJECTS_URL, headers={'If-None-Match': if_none_match}
+        )
+        assert cached.status_code == 304, (
+            'На запрос с актуальным `If-None-Match` должен возвращаться 304.'
+        )
+        assert cached.content == b''
+        assert cached.headers['etag'] == etag
+
+
+def test_projects_if_modified_since(test_client, charity_project):
+    url = f'{PROJECTS_URL}{charity_project.id}'
+    response = test_client.get(url)
+    assert response.status_code == 200
+    cached = test_client.get(
+        url,
+        headers={'If-Modified-Since': response.headers['last-modified']},
+    )
+    assert cached.status_code == 304
+    stale = test_client.get(
+        url, headers={'If-None-Match': '"stale"'}
+    )
+    assert stale.status_code == 200, (
+        '`If-Modified-Since` не учитывается, если есть `If-None-Match`.'
+    )
+
+
+def test_write_changes_etag(superuser_client, charity_project):
+    etag = superuser_client.get(PROJECTS_URL).headers['etag']
+    superuser_client.patch(
+        f'{PROJECTS_URL}{charity_project.id}', json={'name': 'Новое имя'}
+    )
+    response = superuser_client.get(
+        PROJECTS_URL, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
+    assert response.json()[0]['name'] == 'Новое имя'
+
+
+def test_my_donations_not_modified(user_client):
+    etag = user_client.get(MY_DONATIONS_URL).headers['etag']
+    assert user_client.get(
+        MY_DONATIONS_URL, headers={'If-None-Match': etag}
+    ).status_code == 304
+    user_client.post(DONATIONS_URL, json={'full_amount': 100})
+    response = user_client.get(
+        MY_DONATIONS_URL, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+
+def test_donations_not_modified(superuser_client, request):
+    etag = superuser_client.get(DONATIONS_URL).headers['etag']
+    request.getfixturevalue('no_queries')
+    assert superuser_client.get(
+        DONATIONS_URL, headers={'If-None-Match': etag}
+    ).status_code == 304
@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+
+import pytest
+from conftest import AsyncTestingSessionLocal, app
+
+from app.core.db import get_session_factory
+from app.crud.donation import donation_crud
+from app.schemas.donation import DonationCreate
+from app.services import export
+
+DONATIONS_EXPORT_URL = '/donation/export'
+PROJECTS_EXPORT_URL = '/charity_project/export'
+
+
+@pytest.fixture(autouse=True)
+def session_factory(monkeypatch):
+    monkeypatch.setitem(
+        app.dependency_overrides,
+        get_session_factory,
+        lambda: AsyncTestingSessionLocal,
+    )
+    monkeypatch.setattr(export, 'EXPORT_CHUNK_SIZE', 2)
+
+
+async def create_donations(session, count):
+    for number in range(count):
+        await donation_crud.create(
+            session,
+            DonationCreate(full_amount=number + 1, comment=f'Платёж {number}'),
+        )
+    await session.commit()
+
+
+async def test_export_donations_ndjson(superuser_client, session):
+    await create_donations(session, 5)
+    response = superuser_client.get(DONATIONS_EXPORT_URL)
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == superuser_client.get('/donation/').json(), (
+        'Выгрузка NDJSON должна содержать те же пожертвования и поля, '
+        'что и `GET /donation/`.'
+    )
+
+
+async def test_export_donations_csv(superuser_client, session):
+    await create_donations(session, 3)
+    response = superuser_client.get(
+        DONATIONS_EXPORT_URL, params={'format': 'csv'}
+    )
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/csv')
+    assert 'donations.csv' in response.headers['content-disposition']
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row['id'] for row in rows] == ['1', '2', '3']
+    assert rows[0]['comment'] == 'Платёж 0'
+    assert rows[0]['close_date'] == ''
+
+
+def test_export_projects(superuser_client, charity_project):
+    response = superuser_client.get(PROJECTS_EXPORT_URL)
+    assert response.status_code == 200
+    [row] = [json.loads(line) for line in response.text.splitlines()]
+    assert row == superuser_client.get('/charity_project/').json()[0]
+
+
+def test_export_empty_csv_has_header(superuser_client):
+    response = superuser_client.get(
+        PROJECTS_EXPORT_URL, params={'format': 'csv'}
+    )
+    assert response.text.splitlines() == [
+        'name,description,full_amount,id,invested_amount,fully_invested,'
+        'create_date,close_date'
+    ]
+
+
+@pytest.mark.parametrize('url', (DONATIONS_EXPORT_URL, PROJECTS_EXPORT_URL))
+def test_export_superuser_only(user_client, url):
+    assert user_client.get(url).status_code == 403
+
+
+def test_export_unknown_format(superuser_client):
+    response = superuser_client.get(
+        DONATIONS_EXPORT_URL, params={'format': 'xml'}
+    )
+    assert response.status_code == 422
@@ -0,0 +1,105 @@
+import pytest
+from conftest import app, current_user
+from fixtures.user import superuser
+from sqlalchemy import update
+from test_investment_engines import make_events, replay
+
+from app.core.config import settings
+from app.models import FundStats
+from app.services.allocation import ENGINES
+from app.services.fund_stats import get_stats, reconcile, totals_query
+from app.services.ledger import open_pool_ledger
+
+STATS_URL = '/investment/stats'
+RECONCILE_URL = STATS_URL + '/reconcile'
+PROJECT_URL = '/charity_project/'
+
+
+async def recomputed(session):
+    totals = (await session.execute(totals_query())).one()._asdict()
+    totals['total_unallocated'] = (
+        totals['total_raised'] - totals['total_invested']
+    )
+    return totals
+
+
+@pytest.fixture
+def client(superuser_client, monkeypatch):
+    monkeypatch.setitem(
+        app.dependency_overrides, current_user, lambda: superuser
+    )
+    return superuser_client
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+async def test_stats_follow_allocation(session, monkeypatch, engine):
+    monkeypatch.setattr(settings, 'investment_engine', engine)
+    if engine == 'ledger':
+        monkeypatch.setattr(open_pool_ledger, 'ready', False)
+        await open_pool_ledger.build(session)
+    await reconcile(session)
+    await replay(session, make_events(seed=4))
+    session.expire_all()
+    assert await get_stats(session) == await recomputed(session), (
+        f'При механизме `{engine}` сводные показатели должны обновляться '
+        'вместе с распределением средств.'
+    )
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+async def test_stats_follow_endpoints(client, session, monkeypatch, engine):
+    monkeypatch.setattr(settings, 'investment_engine', engine)
+    if engine == 'ledger':
+        monkeypatch.setattr(open_pool_ledger, 'ready', False)
+        await open_pool_ledger.build(session)
+    await reconcile(session)
+    client.post('/donation/bulk', json=[
+        {'full_amount': amount} for amount in (300, 500, 200)
+    ])
+    client.post(PROJECT_URL + 'bulk', json=[
+        {
+            'name': f'Проект {number}',
+            'description': 'Описание проекта',
+            'full_amount': 400,
+        }
+        for number in range(3)
+    ])
+    client.post('/donation/', json={'full_amount': 700})
+    project = client.post(PROJECT_URL, json={
+        'name': 'Проект на закрытие',
+        'description': 'Описание проекта',
+        'full_amount': 1000,
+    }).json()
+    client.patch(PROJECT_URL + str(project['id']), json={
+        'full_amount': project['invested_amount']
+    })
+    removable = client.post(PROJECT_URL, json={
+        'name': 'Проект на удаление',
+        'description': 'Описание проекта',
+        'full_amount': 1000,
+    }).json()
+    client.delete(PROJECT_URL + str(removable['id']))
+
+    response = client.get(STATS_URL)
+    assert response.status_code == 200
+    assert response.json() == await recomputed(session), (
+        'Сводные показатели должны совпадать с пересчитанными по всем '
+        'строкам после создания, изменения и удаления объектов.'
+    )
+    assert response.json()['closed_projects'] == 4
+
+
+async def test_reconcile_fixes_drift(client, session):
+    client.post('/donation/', json={'full_amount': 100})
+    await session.execute(update(FundStats).values(total_raised=0))
+    await session.commit()
+    assert client.get(STATS_URL).json()['total_raised'] == 0
+    response = client.post(RECONCILE_URL)
+    assert response.json()['total_raised'] == 100, (
+        'Пересчёт должен восстанавливать показатели по данным базы.'
+    )
+
+
+def test_stats_superuser_only(user_client):
+    assert user_client.get(STATS_URL).status_code == 403
+    assert user_client.post(RECONCILE_URL).status_code == 403
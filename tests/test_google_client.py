@@ -0,0 +1,71 @@
+import asyncio
+
+from app.core import google_client as google_client_module
+from app.core.google_client import GoogleClient, get_service, google_client
+
+
+async def test_shared_client_reused(monkeypatch):
+    client = GoogleClient(google_client_module.CREDENTIALS)
+    monkeypatch.setattr(google_client_module, 'google_client', client)
+    exchanges = 0
+
+    async def refresh():
+        nonlocal exchanges
+        await asyncio.sleep(0)
+        exchanges += 1
+
+    await client.start()
+    try:
+        monkeypatch.setattr(
+            client.aiogoogle.service_account_manager, 'refresh', refresh
+        )
+        services = []
+        for _ in range(3):
+            dependency = get_service()
+            aiogoogle = await anext(dependency)
+            assert aiogoogle._get_session() is client.session, (
+                'Запросы должны идти через общую HTTP-сессию клиента.'
+            )
+            services.append(aiogoogle)
+            await dependency.aclose()
+        assert all(service is client.aiogoogle for service in services)
+        assert exchanges == 3
+    finally:
+        await client.stop()
+    assert not client.running
+
+
+async def test_token_refresh_serialized(monkeypatch):
+    client = GoogleClient(google_client_module.CREDENTIALS)
+    await client.start()
+    active = peak = 0
+
+    async def refresh():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    try:
+        monkeypatch.setattr(
+            client.aiogoogle.service_account_manager, 'refresh', refresh
+        )
+        await asyncio.gather(*(client.refresh_token() for _ in range(5)))
+    finally:
+        await client.stop()
+    assert peak == 1, 'Токен не должен запрашиваться параллельно.'
+
+
+async def test_per_request_client_without_lifespan():
+    assert not google_client.running
+    dependency = get_service()
+    aiogoogle = await anext(dependency)
+    assert aiogoogle._get_session() is not None
+    await dependency.aclose()
+
+
+def test_lifespan_manages_client(test_client):
+    assert google_client.running, (
+        'Общий клиент Google API должен запускаться в lifespan приложения.'
+    )
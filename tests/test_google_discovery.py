@@ -0,0 +1,102 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import google_api
+from app.services.google_discovery import SHEETS, DiscoveryCache
+
+DOCUMENT = {'name': 'sheets', 'version': 'v4', 'parameters': {}}
+
+
+class FakeAiogoogle:
+    """Отдаёт документ обнаружения вместо загрузки из сети."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.discovery_service = SimpleNamespace(apis=SimpleNamespace(
+            getRest=lambda api, version, validate: (api, version)
+        ))
+        self.requests = []
+
+    async def as_anon(self, request):
+        self.requests.append(request)
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        return dict(DOCUMENT)
+
+    async def discover(self, *args, **kwargs):
+        raise AssertionError('Документ обнаружения должен браться из кэша.')
+
+
+async def test_document_fetched_once(tmp_path):
+    cache = DiscoveryCache(tmp_path, max_age=60)
+    aiogoogle = FakeAiogoogle()
+    services = await asyncio.gather(
+        *(cache.get(aiogoogle, *SHEETS) for _ in range(5))
+    )
+    assert all(service is services[0] for service in services)
+    assert aiogoogle.requests == [SHEETS], (
+        'Документ обнаружения должен загружаться один раз на процесс.'
+    )
+    assert cache.path(*SHEETS).exists()
+
+
+async def test_document_read_from_disk(tmp_path):
+    await DiscoveryCache(tmp_path, max_age=60).get(FakeAiogoogle(), *SHEETS)
+    aiogoogle = FakeAiogoogle()
+    service = await DiscoveryCache(tmp_path, max_age=60).get(
+        aiogoogle, *SHEETS
+    )
+    assert not aiogoogle.requests, (
+        'Свежая копия на диске должна использоваться без загрузки.'
+    )
+    assert service.discovery_document['name'] == 'sheets'
+
+
+async def test_stale_document_refreshed(tmp_path):
+    cache = DiscoveryCache(tmp_path, max_age=60)
+    await cache.get(FakeAiogoogle(), *SHEETS)
+    stale = time.time() - 120
+    os.utime(cache.path(*SHEETS), (stale, stale))
+    aiogoogle = FakeAiogoogle()
+    await DiscoveryCache(tmp_path, max_age=60).get(aiogoogle, *SHEETS)
+    assert aiogoogle.requests == [SHEETS]
+    assert cache.path(*SHEETS).stat().st_mtime > stale
+
+
+async def test_stale_document_used_when_fetch_fails(tmp_path):
+    cache = DiscoveryCache(tmp_path, max_age=60)
+    await cache.get(FakeAiogoogle(), *SHEETS)
+    stale = time.time() - 120
+    os.utime(cache.path(*SHEETS), (stale, stale))
+    service = await DiscoveryCache(tmp_path, max_age=60).get(
+        FakeAiogoogle(error=OSError('нет сети')), *SHEETS
+    )
+    assert service.discovery_document['version'] == 'v4'
+    with pytest.raises(OSError):
+        await DiscoveryCache(tmp_path / 'empty', max_age=60).get(
+            FakeAiogoogle(error=OSError('нет сети')), *SHEETS
+        )
+
+
+async def test_google_api_uses_discovery_cache(tmp_path, monkeypatch):
+    cache = DiscoveryCache(tmp_path, max_age=60)
+    cache.services[SHEETS] = SimpleNamespace(spreadsheets=SimpleNamespace(
+        values=SimpleNamespace(update=lambda **request: request)
+    ))
+    monkeypatch.setattr(google_api, 'discovery_cache', cache)
+    aiogoogle = FakeAiogoogle()
+    calls = []
+
+    async def as_service_account(request):
+        calls.append(request)
+
+    aiogoogle.as_service_account = as_service_account
+    await google_api.spreadsheets_update_value(aiogoogle, 'id', [['a']])
+    await google_api.spreadsheets_update_value(aiogoogle, 'id', [['b']])
+    assert not aiogoogle.requests
+    assert [call['json']['values'] for call in calls] == [[['a']], [['b']]]
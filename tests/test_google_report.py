@@ -0,0 +1,190 @@
+import asyncio
+import time
+from datetime import datetime
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from conftest import AsyncTestingSessionLocal, app
+
+from app.core.constants import COLUMNS_LIMIT
+from app.core.db import get_session_factory
+from app.core.google_client import get_service
+from app.models import CharityProject
+from app.services import google_api, reports
+from app.services.google_discovery import DRIVE, SHEETS, DiscoveryCache
+from app.services.reports import (DONE, FAILED, ReportJobs, build_report,
+                                  report_jobs)
+
+REPORT_URL = '/google/'
+SPREADSHEET = dict(spreadsheetId='sheet-id', spreadsheetUrl='sheet-url')
+
+
+class FakeAiogoogle:
+    """Записывает вызовы Google API вместо отправки."""
+
+    def __init__(self):
+        self.calls = []
+        self.in_flight = self.peak = 0
+
+    async def as_service_account(self, request):
+        self.calls.append(request)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        return SPREADSHEET if request[0] == 'create' else {}
+
+
+@pytest.fixture
+def aiogoogle(monkeypatch, tmp_path):
+    cache = DiscoveryCache(tmp_path, max_age=60)
+    cache.services[SHEETS] = SimpleNamespace(spreadsheets=SimpleNamespace(
+        create=lambda json: ('create', json),
+        values=SimpleNamespace(update=lambda **request: ('update', request)),
+    ))
+    cache.services[DRIVE] = SimpleNamespace(permissions=SimpleNamespace(
+        create=lambda **request: ('permission', request),
+    ))
+    for module in ('app.services.google_api', 'app.services.reports'):
+        monkeypatch.setattr(f'{module}.discovery_cache', cache)
+    fake = FakeAiogoogle()
+
+    async def override():
+        yield fake
+
+    monkeypatch.setitem(app.dependency_overrides, get_service, override)
+    monkeypatch.setitem(
+        app.dependency_overrides,
+        get_session_factory,
+        lambda: AsyncTestingSessionLocal,
+    )
+    monkeypatch.setattr(
+        report_jobs, 'service_factory', asynccontextmanager(override)
+    )
+    monkeypatch.setattr(report_jobs, 'current', None)
+    return fake
+
+
+def test_grid_data_cells():
+    data = google_api.grid_data([['a', 1, None], [True]])
+    assert data['rowData'] == [
+        dict(values=[
+            dict(userEnteredValue=dict(stringValue='a')),
+            dict(userEnteredValue=dict(numberValue=1)),
+            {},
+        ]),
+        dict(values=[dict(userEnteredValue=dict(boolValue=True))]),
+    ]
+
+
+@pytest.mark.usefixtures('small_fully_invested_charity_project')
+def test_report_created_with_inline_values(superuser_client, aiogoogle):
+    response = superuser_client.post(REPORT_URL)
+    assert response.status_code == 200
+    assert response.json() == 'sheet-url'
+    assert [call[0] for call in aiogoogle.calls] == ['create', 'permission'], (
+        'Отчёт должен создаваться одним запросом к Sheets API вместе с '
+        'данными, после чего выдаются права доступа.'
+    )
+    sheet = aiogoogle.calls[0][1]['sheets'][0]
+    rows = sheet['data'][0]['rowData']
+    assert len(rows) == 4
+    assert sheet['properties']['gridProperties'] == dict(
+        rowCount=4, columnCount=COLUMNS_LIMIT
+    )
+    assert rows[3]['values'][0] == dict(
+        userEnteredValue=dict(stringValue='1M$ for ur project')
+    )
+    assert aiogoogle.calls[1][1]['fileId'] == 'sheet-id'
+
+
+async def test_concurrent_jobs_merged(aiogoogle):
+    jobs = ReportJobs(service_factory=report_jobs.service_factory)
+    first = jobs.submit(AsyncTestingSessionLocal)
+    second = jobs.submit(AsyncTestingSessionLocal)
+    assert first is second, (
+        'Пока задание не завершено, новые запросы должны получать его же.'
+    )
+    await asyncio.gather(*jobs.tasks)
+    assert first.status == DONE and first.url == 'sheet-url'
+    assert set(first.timings) == {
+        'query', 'discovery', 'create', 'permissions', 'write', 'total'
+    }
+    assert jobs.submit(AsyncTestingSessionLocal) is not first
+    await jobs.stop()
+
+
+async def test_failed_job(aiogoogle, monkeypatch):
+    async def fail(request):
+        raise RuntimeError('нет доступа')
+
+    monkeypatch.setattr(aiogoogle, 'as_service_account', fail)
+    jobs = ReportJobs(service_factory=report_jobs.service_factory)
+    job = jobs.submit(AsyncTestingSessionLocal)
+    await asyncio.gather(*jobs.tasks)
+    assert job.status == FAILED
+    assert job.error == 'RuntimeError: нет доступа'
+
+
+def test_report_job_endpoints(superuser_client, aiogoogle):
+    response = superuser_client.post('/google/jobs')
+    assert response.status_code == 202
+    job_id = response.json()['id']
+    deadline = time.monotonic() + 5
+    while True:
+        job = superuser_client.get(f'/google/jobs/{job_id}').json()
+        if job['status'] not in ('pending', 'running'):
+            break
+        assert time.monotonic() < deadline, 'Задание не завершилось.'
+        time.sleep(0.01)
+    assert job['status'] == 'done'
+    assert job['url'] == 'sheet-url'
+    assert job['timings']['total'] >= job['timings']['create']
+    assert superuser_client.get('/google/jobs/unknown').status_code == 404
+
+
+def test_report_jobs_superuser_only(user_client):
+    assert user_client.post('/google/jobs').status_code == 403
+
+
+async def create_closed_projects(session, count):
+    for number in range(count):
+        session.add(CharityProject(
+            name=f'Проект {number}',
+            description='Закрытый проект',
+            full_amount=100,
+            invested_amount=100,
+            fully_invested=True,
+            create_date=datetime(2026, 1, 1),
+            close_date=datetime(2026, 1, 2 + number),
+        ))
+    await session.commit()
+
+
+async def test_large_report_written_in_chunks(
+    session, aiogoogle, monkeypatch,
+):
+    monkeypatch.setattr(reports, 'ROWS_LIMIT', 2)
+    monkeypatch.setattr(reports.settings, 'report_max_writes', 2)
+    await create_closed_projects(session, 9)
+    timings = {}
+    assert await build_report(session, aiogoogle, timings) == 'sheet-url'
+    create = aiogoogle.calls[0][1]['sheets'][0]
+    assert create['properties']['gridProperties']['rowCount'] == 12, (
+        'Сетка листа должна вмещать заголовок и все закрытые проекты.'
+    )
+    assert len(create['data'][0]['rowData']) == 5
+    updates = [call[1] for call in aiogoogle.calls if call[0] == 'update']
+    assert [update['range'] for update in updates] == [
+        'A6', 'A8', 'A10', 'A12'
+    ]
+    names = [
+        row[0] for update in updates for row in update['json']['values']
+    ]
+    assert names == [f'Проект {number}' for number in range(2, 9)]
+    assert aiogoogle.peak <= 2 + 1, (
+        'Одновременно выполняется не больше `report_max_writes` записей '
+        '(и выдача прав).'
+    )
+    assert {'query', 'create', 'permissions', 'write'} <= set(timings)
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.models import CharityProject, Donation
+from app.services.investment_sql import get_fifo_prefix
+
+
+async def explain_executed(session, run):
+    """Планы запросов SELECT, выполненных внутри `run`."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, *args):
+        if statement.lstrip().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, 'before_cursor_execute', capture)
+    try:
+        await run()
+    finally:
+        event.remove(sync_engine, 'before_cursor_execute', capture)
+    connection = await session.connection()
+    plans = []
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(
+            'EXPLAIN QUERY PLAN ' + statement, parameters
+        )
+        plans.append(' | '.join(row[-1] for row in result.all()))
+    return plans
+
+
+@pytest.mark.parametrize('crud, index', (
+    (charity_project_crud, 'ix_charityproject_open_fifo'),
+    (donation_crud, 'ix_donation_open_fifo'),
+))
+async def test_open_pool_queries_use_partial_index(session, crud, index):
+    async def run():
+        async for _ in crud.iter_opened(session, 1):
+            pass
+        await crud.get_open_balances(session)
+        await get_fifo_prefix(session, crud.model, 100)
+
+    plans = await explain_executed(session, run)
+    assert plans
+    for plan in plans:
+        assert f'USING INDEX {index}' in plan, (
+            'Запросы очереди открытых объектов должны использовать '
+            f'частичный индекс `{index}`. План запроса: {plan}'
+        )
+        assert f'SCAN {crud.model.__tablename__} |' not in plan + ' |', (
+            'Открытые объекты не должны выбираться полным просмотром '
+            f'таблицы. План запроса: {plan}'
+        )
+
+
+async def test_donations_by_user_use_index(session):
+    async def run():
+        await donation_crud.get_by_user(session, SimpleNamespace(id=1))
+
+    [plan] = await explain_executed(session, run)
+    assert 'USING INDEX ix_donation_user_id' in plan, (
+        'Пожертвования пользователя должны выбираться по индексу '
+        f'`ix_donation_user_id`. План запроса: {plan}'
+    )
+
+
+@pytest.mark.parametrize('model', (CharityProject, Donation))
+def test_open_pool_index_is_partial(model):
+    [index] = [
+        index for index in model.__table__.indexes
+        if index.name.endswith('_open_fifo')
+    ]
+    assert [column.name for column in index.columns] == ['create_date', 'id']
+    assert index.dialect_options['sqlite']['where'] is not None
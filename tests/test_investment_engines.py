@@ -0,0 +1,186 @@
+import random
+
+import pytest
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.models import Donation
+from app.schemas.charity_project import CharityProjectCreate
+from app.schemas.donation import DonationCreate
+from app.services.allocation import ENGINES, allocate
+from app.services.investment import invest_funds
+from app.services.ledger import open_pool_ledger
+
+
+class Record:
+    def __init__(self, full_amount):
+        self.full_amount = full_amount
+        self.invested_amount = 0
+        self.fully_invested = False
+        self.close_date = None
+
+    @property
+    def remaining(self):
+        return self.full_amount - self.invested_amount
+
+
+def make_events(seed, count=60):
+    rnd = random.Random(seed)
+    return [
+        (rnd.choice(('project', 'donation')), rnd.randint(1, 500))
+        for _ in range(count)
+    ]
+
+
+def simulate(events):
+    projects, donations = [], []
+    for kind, amount in events:
+        target = Record(amount)
+        if kind == 'project':
+            projects.append(target)
+            invest_funds(
+                target, [d for d in donations if not d.fully_invested]
+            )
+        else:
+            donations.append(target)
+            invest_funds(
+                target, [p for p in projects if not p.fully_invested]
+            )
+    return (
+        [(p.invested_amount, p.fully_invested) for p in projects],
+        [(d.invested_amount, d.fully_invested) for d in donations],
+    )
+
+
+async def replay(session, events):
+    for number, (kind, amount) in enumerate(events):
+        if kind == 'project':
+            target = await charity_project_crud.create(
+                session,
+                CharityProjectCreate(
+                    name=f'Проект {number}',
+                    description='Описание проекта',
+                    full_amount=amount,
+                ),
+            )
+            await allocate(session, target, donation_crud)
+        else:
+            target = await donation_crud.create(
+                session, DonationCreate(full_amount=amount)
+            )
+            await allocate(session, target, charity_project_crud)
+        await session.commit()
+    session.expire_all()
+    return (
+        [
+            (p.invested_amount, p.fully_invested)
+            for p in await charity_project_crud.get_multi(session)
+        ],
+        [
+            (d.invested_amount, d.fully_invested)
+            for d in await donation_crud.get_multi(session)
+        ],
+    )
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+@pytest.mark.parametrize('seed', (1, 2, 3))
+async def test_engines_match_invest_funds(session, monkeypatch, engine, seed):
+    monkeypatch.setattr(settings, 'investment_engine', engine)
+    if engine == 'ledger':
+        monkeypatch.setattr(open_pool_ledger, 'ready', False)
+        await open_pool_ledger.build(session)
+    events = make_events(seed)
+    assert await replay(session, events) == simulate(events), (
+        f'Механизм инвестирования `{engine}` должен распределять средства '
+        'так же, как `invest_funds`.'
+    )
+
+
+async def test_unknown_engine(session, monkeypatch):
+    monkeypatch.setattr(settings, 'investment_engine', 'unknown')
+    target = Record(100)
+    with pytest.raises(ValueError):
+        await allocate(session, target, donation_crud)
+
+
+async def test_python_engine_stops_fetching(session, monkeypatch):
+    monkeypatch.setattr(settings, 'investment_engine', 'python')
+    monkeypatch.setattr(settings, 'investment_chunk_size', 2)
+    for _ in range(20):
+        await donation_crud.create(session, DonationCreate(full_amount=10))
+    await session.commit()
+
+    statements = []
+
+    def count_donation_selects(conn, cursor, statement, *args):
+        if statement.startswith('SELECT') and 'FROM donation' in statement:
+            statements.append(statement)
+
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, 'before_cursor_execute', count_donation_selects)
+    try:
+        project = await charity_project_crud.create(
+            session,
+            CharityProjectCreate(
+                name='Маленький проект',
+                description='Описание проекта',
+                full_amount=35,
+            ),
+        )
+        await allocate(session, project, donation_crud)
+    finally:
+        event.remove(
+            sync_engine, 'before_cursor_execute', count_donation_selects
+        )
+
+    assert project.fully_invested
+    assert len(statements) == 2, (
+        'Открытые пожертвования должны читаться порциями, и чтение должно '
+        'прекращаться, как только проект закрыт.'
+    )
+
+
+async def test_slots_engine_writes_back_in_one_update(session, monkeypatch):
+    monkeypatch.setattr(settings, 'investment_engine', 'slots')
+    for _ in range(5):
+        await donation_crud.create(session, DonationCreate(full_amount=10))
+    await session.commit()
+    session.expunge_all()
+
+    statements = []
+
+    def collect_donation_writes(conn, cursor, statement, parameters, *args):
+        if statement.startswith('UPDATE donation'):
+            statements.append(parameters)
+
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, 'before_cursor_execute', collect_donation_writes)
+    try:
+        project = await charity_project_crud.create(
+            session,
+            CharityProjectCreate(
+                name='Проект на слотах',
+                description='Описание проекта',
+                full_amount=35,
+            ),
+        )
+        await allocate(session, project, donation_crud)
+        await session.commit()
+    finally:
+        event.remove(
+            sync_engine, 'before_cursor_execute', collect_donation_writes
+        )
+
+    assert project.invested_amount == 35 and project.fully_invested
+    assert len(statements) == 1 and len(statements[0]) == 4, (
+        'Механизм `slots` должен сохранять затронутые пожертвования одним '
+        'executemany UPDATE.'
+    )
+    assert not any(
+        isinstance(obj, Donation) for obj in session.identity_map.values()
+    ), (
+        'Механизм `slots` не должен загружать пожертвования как объекты ORM.'
+    )
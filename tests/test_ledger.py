@@ -0,0 +1,191 @@
+import random
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.models import CharityProject
+from app.services import ledger as ledger_module
+from app.services.ledger import OpenQueue, open_pool_ledger
+
+LEDGER_URL = '/investment/ledger'
+REBUILD_URL = LEDGER_URL + '/rebuild'
+DONATION_URL = '/donation/'
+
+
+@pytest_asyncio.fixture
+async def ledger(session, monkeypatch, superuser_client):
+    monkeypatch.setattr(settings, 'investment_engine', 'ledger')
+    await open_pool_ledger.build(session)
+    yield open_pool_ledger
+    open_pool_ledger.ready = False
+    for queue in open_pool_ledger.queues.values():
+        queue.__init__()
+
+
+def test_open_queue_take():
+    queue = OpenQueue()
+    queue.put(2, 2, 30)
+    queue.put(1, 1, 50)
+    queue.put(3, 3, 40)
+    assert queue.total == 120
+    assert queue.take(50) == [1]
+    assert queue.take(51) == [1, 2]
+    assert queue.take(1000) == [1, 2, 3]
+    queue.discard(2)
+    assert queue.total == 90
+    assert queue.take(51) == [1, 3]
+
+
+@pytest.fixture(params=('numpy', 'bisect'))
+def queue_backend(request, monkeypatch):
+    monkeypatch.setattr(OpenQueue, 'COMPACT_THRESHOLD', 4)
+    if request.param == 'bisect':
+        monkeypatch.setattr(ledger_module, 'np', None)
+    elif ledger_module.np is None:
+        pytest.skip('numpy не установлен')
+
+
+def reference_plan(items, amounts):
+    queue = [[obj_id, remaining] for obj_id, remaining in items]
+    position, plan = 0, []
+    for amount in amounts:
+        ids = []
+        while position < len(queue) and amount > 0:
+            item = queue[position]
+            ids.append(item[0])
+            used = min(item[1], amount)
+            item[1] -= used
+            amount -= used
+            if item[1] == 0:
+                position += 1
+        plan.append(ids)
+    return plan
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_open_queue_matches_reference(queue_backend, seed):
+    rnd = random.Random(seed)
+    queue, items = OpenQueue(), {}
+    for obj_id in range(1, 300):
+        operation = rnd.random()
+        if operation < 0.5 or not items:
+            create_date = obj_id if rnd.random() < 0.9 else rnd.randint(0, 300)
+            items[obj_id] = (create_date, rnd.randint(0, 50))
+            queue.put(obj_id, *items[obj_id])
+        elif operation < 0.7:
+            head = min(items, key=lambda key: (items[key][0], key))
+            if rnd.random() < 0.5:
+                queue.discard(head)
+                del items[head]
+            else:
+                items[head] = (items[head][0], rnd.randint(0, 50))
+                queue.put(head, *items[head])
+        elif operation < 0.85:
+            changed = rnd.choice(list(items))
+            items[changed] = (items[changed][0], rnd.randint(0, 50))
+            queue.put(changed, *items[changed])
+        else:
+            removed = rnd.choice(list(items))
+            queue.discard(removed)
+            del items[removed]
+
+        ordered = [
+            (key, items[key][1])
+            for key in sorted(items, key=lambda key: (items[key][0], key))
+        ]
+        assert queue.balances() == dict(ordered)
+        assert queue.total == sum(items[key][1] for key in items)
+        amounts = [rnd.randint(1, 80) for _ in range(5)]
+        assert queue.plan(amounts) == reference_plan(ordered, amounts), (
+            'План распределения пачки должен совпадать с последовательным '
+            'распределением по очереди.'
+        )
+        assert queue.take(amounts[0]) == reference_plan(
+            ordered, amounts[:1]
+        )[0]
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+async def test_ledger_follows_commits(user_client, ledger, superuser_client):
+    projects = ledger.queue(CharityProject)
+    assert len(projects) == 2
+    total = projects.total
+    user_client.post(DONATION_URL, json={'full_amount': 1000})
+    assert projects.total == total - 1000, (
+        'После фиксации пожертвования остаток открытых проектов в учёте '
+        'должен уменьшиться на сумму пожертвования.'
+    )
+    response = superuser_client.get(LEDGER_URL)
+    assert response.status_code == 200
+    assert response.json()['consistent'], (
+        'Учёт открытых объектов должен совпадать с базой данных.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+async def test_ledger_rebuild(ledger, session, superuser_client):
+    await session.execute(update(CharityProject).values(invested_amount=10))
+    await session.commit()
+    report = superuser_client.get(LEDGER_URL).json()
+    assert not report['consistent'], (
+        'Сверка должна обнаруживать расхождение учёта с базой данных.'
+    )
+    assert report['charityproject']['mismatched_ids']
+    report = superuser_client.post(REBUILD_URL).json()
+    assert report['consistent'], (
+        'После перестроения учёт должен совпадать с базой данных.'
+    )
+
+
+def test_ledger_superuser_only(user_client):
+    assert user_client.get(LEDGER_URL).status_code == 403
+    assert user_client.post(REBUILD_URL).status_code == 403
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+async def test_ledger_plans_bulk_projects(ledger, superuser_client):
+    response = superuser_client.post(
+        '/charity_project/bulk',
+        json=[
+            {
+                'name': f'Bulk project {amount}',
+                'description': 'Описание проекта',
+                'full_amount': amount,
+            }
+            for amount in (50, 100, 5000)
+        ],
+    )
+    assert [
+        (item['invested_amount'], item['fully_invested'])
+        for item in response.json()['items']
+    ] == [(50, True), (100, True), (1950, False)], (
+        'Пачка проектов по плану резидентного учёта должна распределяться '
+        'так же, как без него.'
+    )
+    assert superuser_client.get(LEDGER_URL).json()['consistent']
+
+
+async def test_ledger_drift_falls_back(
+    user_client, ledger, session, charity_project, charity_project_nunchaku,
+):
+    await session.execute(
+        update(CharityProject)
+        .where(CharityProject.id == charity_project.id)
+        .values(invested_amount=CharityProject.full_amount,
+                fully_invested=True)
+    )
+    await session.commit()
+    user_client.post(DONATION_URL, json={'full_amount': 1000})
+    project = await session.get(
+        CharityProject, charity_project_nunchaku.id, populate_existing=True
+    )
+    assert project.invested_amount == 1000, (
+        'Если учёт разошёлся с базой, пожертвование должно распределяться '
+        'по открытым проектам из базы.'
+    )
+    report = await ledger.check(session)
+    assert report['consistent'], (
+        'Разошедшийся с базой учёт должен перестраиваться.'
+    )
@@ -0,0 +1,106 @@
+import pytest
+from fixtures.user import superuser, user
+
+from app.core.constants import NEXT_CURSOR_HEADER
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.schemas.charity_project import CharityProjectCreate
+from app.schemas.donation import DonationCreate
+
+PROJECTS_URL = '/charity_project/'
+MY_DONATIONS_URL = '/donation/my'
+
+
+async def create_projects(session, count):
+    for number in range(count):
+        await charity_project_crud.create(
+            session,
+            CharityProjectCreate(
+                name=f'Проект {number}',
+                description='Описание проекта',
+                full_amount=100,
+            ),
+        )
+    await session.commit()
+
+
+def collect_pages(client, url, limit):
+    ids, pages = [], 0
+    params = {'limit': limit}
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        assert len(response.json()) <= limit
+        ids.extend(item['id'] for item in response.json())
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return ids, pages
+        params = {'limit': limit, 'cursor': cursor}
+
+
+async def test_projects_keyset_pages(test_client, session):
+    await create_projects(session, 5)
+    ids, pages = collect_pages(test_client, PROJECTS_URL, limit=2)
+    assert ids == [1, 2, 3, 4, 5] and pages == 3, (
+        'Постраничная выдача должна возвращать все проекты по возрастанию '
+        '`id` без пропусков и повторов.'
+    )
+
+
+async def test_projects_full_list_without_limit(test_client, session):
+    await create_projects(session, 3)
+    response = test_client.get(PROJECTS_URL)
+    assert len(response.json()) == 3
+    assert NEXT_CURSOR_HEADER not in response.headers, (
+        'Без `limit` и `cursor` список должен возвращаться целиком.'
+    )
+
+
+async def test_last_page_has_no_cursor(test_client, session):
+    await create_projects(session, 2)
+    response = test_client.get(PROJECTS_URL, params={'limit': 2})
+    assert len(response.json()) == 2
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+@pytest.mark.parametrize('params, status_code', (
+    ({'cursor': 'мусор'}, 400),
+    ({'cursor': 'aWQ6eA=='}, 400),
+    ({'limit': 0}, 422),
+    ({'limit': 100000}, 422),
+))
+def test_invalid_page_params(test_client, params, status_code):
+    response = test_client.get(PROJECTS_URL, params=params)
+    assert response.status_code == status_code
+
+
+async def test_my_donations_pages(user_client, session):
+    for owner in (user, superuser, user, user, superuser, user):
+        await donation_crud.create(
+            session, DonationCreate(full_amount=10), owner
+        )
+    await session.commit()
+    ids, _ = collect_pages(user_client, MY_DONATIONS_URL, limit=3)
+    assert ids == [1, 3, 4, 6], (
+        'Постраничная выдача `/donation/my` должна содержать только '
+        'пожертвования текущего пользователя.'
+    )
+
+
+async def test_rows_bypass_identity_map(session):
+    await create_projects(session, 3)
+    session.expunge_all()
+    fields = ['id', 'name', 'invested_amount']
+    rows = await charity_project_crud.get_multi_rows(session, fields)
+    page, next_id = await charity_project_crud.get_page(
+        session, 2, None, fields=fields
+    )
+    assert [dict(row) for row in rows] == [
+        dict(id=number + 1, name=f'Проект {number}', invested_amount=0)
+        for number in range(3)
+    ]
+    assert page == rows[:2] and next_id == 2
+    assert not session.identity_map, (
+        'Проекция столбцов не должна загружать сущности в сессию.'
+    )
@@ -0,0 +1,89 @@
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.replay import (MEMORY_ENGINE, Event, export_events, generate_events,
+                        main, percentile, read_events, replay, write_events)
+from app.schemas.charity_project import CharityProjectCreate
+from app.schemas.donation import DonationCreate
+from app.services.allocation import ENGINES
+
+
+def test_events_round_trip():
+    events = generate_events(20, seed=1)
+    stream = io.StringIO()
+    write_events(events, stream)
+    stream.seek(0)
+    assert read_events(stream) == events
+
+
+def test_read_events_unknown_type():
+    line = json.dumps(
+        dict(type='refund', amount=1, timestamp='2026-01-01T00:00:00')
+    )
+    with pytest.raises(ValueError):
+        read_events([line])
+
+
+def test_percentile():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0
+
+
+async def test_replay_engines_agree():
+    events = generate_events(80, seed=3, project_share=0.3)
+    engines = [MEMORY_ENGINE, *sorted(ENGINES)]
+    report = await replay(events, engines, trace_memory=False)
+    assert report['consistent'], (
+        'Все механизмы инвестирования должны приводить журнал к одному '
+        f'итоговому состоянию. Расхождения: {report["mismatched"]}'
+    )
+    assert set(report['engines']) == set(engines)
+    for engine_report in report['engines'].values():
+        assert engine_report['events'] == 80
+        assert engine_report['latency_ms']['p50'] <= (
+            engine_report['latency_ms']['p99']
+        )
+
+
+async def test_replay_reports_peak_memory():
+    report = await replay(generate_events(10), [MEMORY_ENGINE])
+    assert report['engines'][MEMORY_ENGINE]['peak_memory_bytes'] > 0
+
+
+async def test_export_events(session):
+    await donation_crud.create(session, DonationCreate(full_amount=30))
+    await charity_project_crud.create(
+        session,
+        CharityProjectCreate(
+            name='Проект из базы',
+            description='Описание проекта',
+            full_amount=100,
+        ),
+    )
+    await session.commit()
+    events = await export_events(session)
+    assert [(event.kind, event.amount) for event in events] == [
+        ('donation', 30), ('project', 100)
+    ], 'Журнал из базы должен быть упорядочен по дате создания.'
+
+
+async def test_main(tmp_path, capsys):
+    log = tmp_path / 'events.ndjson'
+    with open(log, 'w', encoding='utf-8') as stream:
+        write_events([
+            Event('donation', 30, datetime(2026, 1, 1)),
+            Event('project', 100, datetime(2026, 1, 2)),
+        ], stream)
+    code = await main([str(log), '--engine', 'memory', '--engine', 'sql'])
+    report = json.loads(capsys.readouterr().out)
+    assert code == 0 and report['consistent']
+    assert report['engines']['sql']['final_state']['project'] == {
+        'count': 1, 'invested_amount': 30, 'closed': 0,
+    }
@@ -0,0 +1,139 @@
+import pytest
+from conftest import AsyncTestingSessionLocal
+from sqlalchemy import event
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.config import settings
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.models import Donation
+from app.schemas.charity_project import CharityProjectCreate
+from app.schemas.donation import DonationCreate
+from app.services import allocation
+from app.services.investment_sql import invest_funds_sql
+from app.services.records import get_open_records, write_back
+from app.services.writer import AllocationWriter
+
+DONATION_URL = '/donation/'
+
+
+async def create_project(session, amount=1000):
+    project = await charity_project_crud.create(
+        session,
+        CharityProjectCreate(
+            name='Проект с версией',
+            description='Описание проекта',
+            full_amount=amount,
+        ),
+    )
+    await session.commit()
+    return project
+
+
+async def test_concurrent_update_raises_stale_data(session):
+    project = await create_project(session)
+    assert project.version == 1
+    async with AsyncTestingSessionLocal() as other_session:
+        other = await charity_project_crud.get(other_session, project.id)
+        other.invested_amount = 100
+        await other_session.commit()
+    project.invested_amount = 100
+    with pytest.raises(StaleDataError):
+        await session.commit()
+
+
+async def test_sql_engine_detects_changed_queue(session):
+    for _ in range(3):
+        await donation_crud.create(session, DonationCreate(full_amount=100))
+    await session.commit()
+    project = await charity_project_crud.create(
+        session,
+        CharityProjectCreate(
+            name='Проект для доноров',
+            description='Описание проекта',
+            full_amount=250,
+        ),
+    )
+
+    written = []
+
+    def concurrent_write(conn, cursor, statement, *args):
+        if (
+            not written and
+            statement.startswith('SELECT') and 'cumulative' in statement
+        ):
+            written.append(True)
+            conn.connection.cursor().execute(
+                'UPDATE donation SET invested_amount = 50, '
+                'version = version + 1 WHERE id = 1'
+            )
+
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, 'after_cursor_execute', concurrent_write)
+    try:
+        with pytest.raises(StaleDataError):
+            await invest_funds_sql(session, project, Donation)
+    finally:
+        event.remove(sync_engine, 'after_cursor_execute', concurrent_write)
+
+
+async def test_execute_retries_on_conflict(session, monkeypatch):
+    monkeypatch.setattr(settings, 'allocation_max_retries', 2)
+    attempts = []
+
+    async def job(session):
+        attempts.append(True)
+        project = await charity_project_crud.create(
+            session,
+            CharityProjectCreate(
+                name=f'Попытка {len(attempts)}',
+                description='Описание проекта',
+                full_amount=100,
+            ),
+        )
+        if len(attempts) < 3:
+            raise StaleDataError('Конфликт версий')
+        return project
+
+    project = await AllocationWriter().execute(job, session)
+    assert len(attempts) == 3, (
+        'При конфликте версий задание должно повторяться.'
+    )
+    assert project.name == 'Попытка 3'
+    projects = await charity_project_crud.get_multi(session)
+    assert [project.name for project in projects] == ['Попытка 3'], (
+        'Результаты неудачных попыток должны откатываться.'
+    )
+
+    attempts.clear()
+    monkeypatch.setattr(settings, 'allocation_max_retries', 1)
+    with pytest.raises(StaleDataError):
+        await AllocationWriter().execute(job, session)
+
+
+def test_conflict_returns_409(user_client, monkeypatch):
+    async def conflict(*args):
+        raise StaleDataError('Конфликт версий')
+
+    monkeypatch.setattr(settings, 'allocation_max_retries', 0)
+    monkeypatch.setitem(allocation.ENGINES, 'python', conflict)
+    response = user_client.post(DONATION_URL, json={'full_amount': 100})
+    assert response.status_code == 409, (
+        'Если конфликт версий не разрешился повторами, должен '
+        'возвращаться статус-код 409.'
+    )
+
+
+async def test_slots_write_back_detects_changed_rows(session):
+    for _ in range(2):
+        await donation_crud.create(session, DonationCreate(full_amount=100))
+    await session.commit()
+    records = await get_open_records(session, Donation, 150)
+    async with AsyncTestingSessionLocal() as other_session:
+        other = await donation_crud.get(other_session, records[1].id)
+        other.invested_amount = 10
+        await other_session.commit()
+    for record in records:
+        record.invested_amount += 50
+    with pytest.raises(StaleDataError):
+        await write_back(session, Donation, records)
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest_asyncio
+from conftest import AsyncTestingSessionLocal
+from fastapi import HTTPException
+
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.schemas.charity_project import CharityProjectCreate
+from app.schemas.donation import DonationCreate
+from app.services.allocation import allocate
+from app.services.writer import AllocationWriter
+
+
+@pytest_asyncio.fixture
+async def writer():
+    writer = AllocationWriter()
+    await writer.start(AsyncTestingSessionLocal, window=0.05, max_batch=10)
+    yield writer
+    await writer.stop()
+
+
+def donation_job(amount):
+    async def create(session):
+        donation = await donation_crud.create(
+            session, DonationCreate(full_amount=amount)
+        )
+        await allocate(session, donation, charity_project_crud)
+        return donation
+    return create
+
+
+async def failing_job(session):
+    raise HTTPException(status_code=400, detail='Ошибка задания')
+
+
+async def test_writer_commits_window_once(writer, session):
+    # Фикстуры проектов замораживают время, а окно писателя ждёт по таймеру,
+    # поэтому проект создаётся здесь.
+    project = await charity_project_crud.create(
+        session,
+        CharityProjectCreate(
+            name='Открытый проект',
+            description='Описание проекта',
+            full_amount=1000,
+        ),
+    )
+    await session.commit()
+    donations = await asyncio.gather(
+        *(writer.submit(donation_job(amount)) for amount in (100, 200, 300))
+    )
+    assert writer.commits == 1, (
+        'Задания одного окна должны фиксироваться одним коммитом.'
+    )
+    assert [donation.invested_amount for donation in donations] == [
+        100, 200, 300
+    ]
+    async with AsyncTestingSessionLocal() as session:
+        project = await charity_project_crud.get(session, project.id)
+    assert project.invested_amount == 600, (
+        'Все пожертвования окна должны быть вложены в открытый проект.'
+    )
+
+
+async def test_writer_isolates_failed_job(writer):
+    results = await asyncio.gather(
+        writer.submit(donation_job(100)),
+        writer.submit(failing_job),
+        writer.submit(donation_job(200)),
+        return_exceptions=True,
+    )
+    assert isinstance(results[1], HTTPException), (
+        'Ошибка задания должна передаваться его автору.'
+    )
+    assert [results[0].full_amount, results[2].full_amount] == [100, 200], (
+        'Ошибка одного задания не должна отменять остальные задания окна.'
+    )
+    async with AsyncTestingSessionLocal() as session:
+        assert len(await donation_crud.get_multi(session)) == 2
+
+
+async def test_writer_stop_fails_pending_jobs():
+    writer = AllocationWriter()
+    await writer.start(AsyncTestingSessionLocal, window=10, max_batch=10)
+    futures = [writer.enqueue(donation_job(100)) for _ in range(3)]
+    await asyncio.sleep(0)
+    await writer.stop()
+    results = await asyncio.wait_for(
+        asyncio.gather(*futures, return_exceptions=True), timeout=1
+    )
+    assert all(isinstance(result, RuntimeError) for result in results), (
+        'При остановке писателя ожидающие задания должны завершаться '
+        'ошибкой, а не зависать.'
+    )